@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def temp_shared_cache():
+    from core.runner import temp_shared_cache
+
+    with temp_shared_cache():
+        yield
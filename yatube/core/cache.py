@@ -0,0 +1,173 @@
+"""Two-level cache: a small in-process LRU in front of a shared cache.
+
+Every write stores a fresh stamp next to the value in the shared cache.
+A read fetches only the stamp and takes the value from the local copy
+when the stamps match, so a write in any process is seen by all of them,
+while large values such as whole pages are not reread on every hit.
+Keys reach the shared cache as given, with the version, so only the
+shared cache applies its KEY_PREFIX.
+"""
+import os
+import pickle
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+
+
+class LockedFileBasedCache(FileBasedCache):
+    """File cache whose add() and incr() are atomic across processes."""
+
+    @contextmanager
+    def lock(self):
+        self._createdir()
+        # Not a .djcache file, so clear() and culling leave it alone.
+        with open(os.path.join(self._dir, 'lock'), 'ab') as file:
+            locks.lock(file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(file)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self.lock():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self.lock():
+            return super().incr(key, delta, version)
+
+
+class TwoLevelCache(BaseCache):
+    """LOCATION names the shared cache alias, MAX_ENTRIES sizes the LRU."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._shared_alias = location
+        self._local = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def shared_timeout(self, timeout):
+        # The shared cache takes relative timeouts and has its own default.
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def stamp_key(self, key):
+        return f'stamp:{key}'
+
+    def remember(self, key, stamp, pickled):
+        with self._lock:
+            self._local[key] = (stamp, pickled)
+            self._local.move_to_end(key)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+
+    def forget(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+
+    def local(self, key, stamp):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None or entry[0] != stamp:
+                return None
+            self._local.move_to_end(key)
+            return entry[1]
+
+    def shared_version(self, version):
+        return self.version if version is None else version
+
+    def local_key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        version = self.shared_version(version)
+        local_key = self.local_key(key, version)
+        stamp = uuid.uuid4().hex
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        timeout = self.shared_timeout(timeout)
+        if not self.shared.add(key, (stamp, pickled), timeout, version):
+            return False
+        self.shared.set(self.stamp_key(key), stamp, timeout, version)
+        self.remember(local_key, stamp, pickled)
+        return True
+
+    def shared_lock(self):
+        # Without a lock in the shared cache increments can be lost.
+        return getattr(self.shared, 'lock', nullcontext)()
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        version = self.shared_version(version)
+        local_keys = {key: self.local_key(key, version) for key in keys}
+        stamp_keys = {self.stamp_key(key): key for key in keys}
+        stamps = {
+            stamp_keys[stamp_key]: stamp
+            for stamp_key, stamp in self.shared.get_many(
+                stamp_keys, version=version
+            ).items()
+        }
+        found = {}
+        missing = []
+        for key, stamp in stamps.items():
+            pickled = self.local(local_keys[key], stamp)
+            if pickled is None:
+                missing.append(key)
+            else:
+                found[key] = pickled
+        shared = (
+            self.shared.get_many(missing, version=version) if missing else {}
+        )
+        for key, (stamp, pickled) in shared.items():
+            if stamp == stamps[key]:
+                self.remember(local_keys[key], stamp, pickled)
+                found[key] = pickled
+        return {key: pickle.loads(pickled) for key, pickled in found.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        version = self.shared_version(version)
+        local_key = self.local_key(key, version)
+        stamp = uuid.uuid4().hex
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self.shared.set_many(
+            {key: (stamp, pickled), self.stamp_key(key): stamp},
+            self.shared_timeout(timeout),
+            version
+        )
+        self.remember(local_key, stamp, pickled)
+
+    def incr(self, key, delta=1, version=None):
+        with self.shared_lock():
+            return super().incr(key, delta, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        version = self.shared_version(version)
+        self.local_key(key, version)
+        timeout = self.shared_timeout(timeout)
+        return (
+            self.shared.touch(self.stamp_key(key), timeout, version)
+            and self.shared.touch(key, timeout, version)
+        )
+
+    def delete(self, key, version=None):
+        version = self.shared_version(version)
+        local_key = self.local_key(key, version)
+        self.shared.delete_many([self.stamp_key(key), key], version)
+        self.forget(local_key)
+
+    def clear(self):
+        self.shared.clear()
+        with self._lock:
+            self._local.clear()
@@ -0,0 +1,48 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        self.check_budget(request, counter.count)
+        return response
+
+    def check_budget(self, request, count):
+        match = request.resolver_match
+        if match is None:
+            return
+        budget = settings.QUERY_BUDGETS.get(
+            match.view_name, settings.QUERY_BUDGET_DEFAULT
+        )
+        if budget is None or count <= budget:
+            return
+        message = (
+            f'{match.view_name} ({request.path}) ran {count} queries, '
+            f'budget is {budget}'
+        )
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,29 @@
+import copy
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+@contextmanager
+def temp_shared_cache():
+    """Point the shared cache at a throwaway directory."""
+    location = tempfile.mkdtemp(prefix='yatube-cache-')
+    caches = copy.deepcopy(settings.CACHES)
+    caches['shared']['LOCATION'] = location
+    try:
+        with override_settings(CACHES=caches):
+            yield
+    finally:
+        shutil.rmtree(location, ignore_errors=True)
+
+
+class TestRunner(DiscoverRunner):
+    """Keeps the tests away from the working cache directory."""
+
+    def run_tests(self, *args, **kwargs):
+        with temp_shared_cache():
+            return super().run_tests(*args, **kwargs)
@@ -6,3 +6,13 @@ register = template.Library()
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={'class': css})
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, **params):
+    """Link to another page of the current listing, keeping its filters."""
+    query = context['request'].GET.copy()
+    for key in ('page', 'after', 'before'):
+        query.pop(key, None)
+    query.update(params)
+    return f'?{query.urlencode()}'
@@ -1,9 +1,136 @@
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Max, Min
+from django.forms import BaseModelFormSet
+from django.template.response import TemplateResponse
 
+from . import bulk
+from .counters import post_count
+from .forms import ConfirmForm, DateRangeForm, GroupChoiceForm
 from .models import Comment, Follow, Group, Post
+from .search import filter_posts
+from .utils import EstimatedPaginator, FeedPaginator
 
 
-class PostAdmin(admin.ModelAdmin):
+def requested_page(request):
+    # The changelist numbers its pages from 0, the autocomplete from 1.
+    if PAGE_VAR not in request.GET:
+        return request.GET.get('page')
+    try:
+        return int(request.GET[PAGE_VAR]) + 1
+    except ValueError:
+        return 1
+
+
+class RowAutocompleteSelect(AutocompleteSelect):
+    """Autocomplete that renders the row's own object without a query."""
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        if self.selected is None or list(map(str, value)) != [
+            str(self.selected.pk)
+        ]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name,
+            self.selected.pk,
+            self.choices.field.label_from_instance(self.selected),
+            True,
+            len(options)
+        ))
+        return [(None, options, 0)]
+
+
+class GroupRowFormSet(BaseModelFormSet):
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        widget = form.fields['group'].widget
+        getattr(widget, 'widget', widget).selected = form.instance.group
+
+
+class BulkActionsMixin:
+    """Admin actions that ask for confirmation and then run set-based."""
+    date_field = None
+
+    def run_bulk(self, request, form_class, description, run, initial=None):
+        if 'apply' in request.POST:
+            form = form_class(request.POST)
+            if form.is_valid():
+                done = run(**form.cleaned_data)
+                self.message_user(request, f'{description}: {done}')
+                return None
+        else:
+            form = form_class(initial=initial)
+        context = {
+            **self.admin_site.each_context(request),
+            'title': description,
+            'description': description,
+            'opts': self.model._meta,
+            'form': form,
+            'action': request.POST['action'],
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', 0),
+        }
+        return TemplateResponse(
+            request, 'admin/posts/bulk_action.html', context
+        )
+
+    def bulk_delete(self, queryset):
+        # Models without a set-based delete in bulk.py still go in chunks.
+        return bulk.delete_rows(queryset)
+
+    def get_actions(self, request):
+        # The stock action loads every object and deletes them one by one.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_in_bulk(self, request, queryset):
+        return self.run_bulk(
+            request, ConfirmForm, 'Удалено', lambda: self.bulk_delete(queryset)
+        )
+    delete_in_bulk.short_description = 'Удалить выбранные'
+    delete_in_bulk.allowed_permissions = ('delete',)
+
+    def delete_by_author(self, request, queryset):
+        # Resolved up front: the selection itself is deleted chunk by chunk.
+        authors = set(queryset.values_list('author', flat=True))
+        return self.run_bulk(
+            request,
+            ConfirmForm,
+            'Удалено у авторов выбранных',
+            lambda: self.bulk_delete(
+                self.model.objects.filter(author__in=authors)
+            )
+        )
+    delete_by_author.short_description = 'Удалить всё у авторов выбранных'
+    delete_by_author.allowed_permissions = ('delete',)
+
+    def delete_by_date_range(self, request, queryset):
+        dates = queryset.aggregate(
+            start=Min(self.date_field), end=Max(self.date_field)
+        )
+        return self.run_bulk(
+            request,
+            DateRangeForm,
+            'Удалено за период',
+            lambda start, end: self.bulk_delete(self.model.objects.filter(**{
+                f'{self.date_field}__date__range': (start, end)
+            })),
+            initial={
+                key: value and value.date() for key, value in dates.items()
+            }
+        )
+    delete_by_date_range.short_description = 'Удалить всё за период'
+    delete_by_date_range.allowed_permissions = ('delete',)
+
+
+class PostAdmin(BulkActionsMixin, admin.ModelAdmin):
     list_display = (
         'pk',
         'text',
@@ -12,12 +139,97 @@ class PostAdmin(admin.ModelAdmin):
         'group'
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('group',)
+    show_full_result_count = False
     empty_value_display = '-пусто-'
+    date_field = 'pub_date'
+    actions = (
+        'delete_in_bulk',
+        'delete_by_author',
+        'delete_by_date_range',
+        'move_to_group',
+    )
+
+    def bulk_delete(self, queryset):
+        return bulk.delete_posts(queryset)
+
+    def move_to_group(self, request, queryset):
+        return self.run_bulk(
+            request,
+            GroupChoiceForm,
+            'Перенесено в группу',
+            lambda group: bulk.move_posts(queryset, group)
+        )
+    move_to_group.short_description = 'Перенести в группу'
+    move_to_group.allowed_permissions = ('change',)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return filter_posts(queryset, search_term), False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'group':
+            kwargs['widget'] = RowAutocompleteSelect(
+                db_field.remote_field,
+                self.admin_site,
+                using=kwargs.get('using')
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_formset(self, request, **kwargs):
+        return super().get_changelist_formset(
+            request, formset=GroupRowFormSet, **kwargs
+        )
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # The unfiltered total is kept in a counter row, filtered ones
+        # are counted only a few pages past the requested one.
+        if queryset.query.where:
+            return EstimatedPaginator(
+                queryset, per_page, number=requested_page(request),
+                orphans=orphans, allow_empty_first_page=allow_empty_first_page
+            )
+        return FeedPaginator(
+            queryset, per_page, count=post_count, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page
+        )
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+    prepopulated_fields = {'slug': ('title',)}
+
+
+class CommentAdmin(BulkActionsMixin, admin.ModelAdmin):
+    list_display = ('pk', 'text', 'created', 'post', 'author')
+    list_select_related = ('post', 'author')
+    search_fields = ('text',)
+    autocomplete_fields = ('post', 'author')
+    show_full_result_count = False
+    date_field = 'created'
+    actions = ('delete_in_bulk', 'delete_by_author', 'delete_by_date_range')
+
+    def bulk_delete(self, queryset):
+        return bulk.delete_comments(queryset)
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    autocomplete_fields = ('user', 'author')
+    show_full_result_count = False
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
-admin.site.register(Comment)
-admin.site.register(Follow)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,160 @@
+"""Read-only JSON mirror of the feed pages for the mobile client.
+
+Every response carries a strong ETag built from the same cache versions
+that invalidate the HTML pages, so a revalidation with If-None-Match is
+answered with 304 after a cache lookup only.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_safe
+
+from .caching import get_versions
+from .counters import user_counts
+from .feed import user_feed
+from .models import Group, Post, User
+from .utils import (FeedPaginator, add_cursors, cursor_page, decode_cursor,
+                    order_fields)
+
+API_VERSION = 'v1'
+POST_FIELDS = {
+    'id': lambda post: post.id,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date.isoformat(),
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group else None,
+    'image': lambda post: post.image.url if post.image else None,
+    'comments_count': lambda post: post.comments_count,
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def api_view(scopes, login=False):
+    """JSON view answering conditional GETs from the scopes' versions."""
+    def etag(request, **kwargs):
+        if login and not request.user.is_authenticated:
+            return None
+        versions = get_versions(scopes(request, **kwargs))
+        raw = '|'.join([
+            API_VERSION,
+            str(request.user.id if login else ''),
+            request.get_full_path(),
+            *map(str, versions),
+        ])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def decorator(view):
+        @require_safe
+        @condition(etag_func=etag)
+        @wraps(view)
+        def wrapper(request, **kwargs):
+            if login and not request.user.is_authenticated:
+                return JsonResponse(
+                    {'detail': 'Требуется авторизация'}, status=401
+                )
+            try:
+                return JsonResponse(view(request, **kwargs))
+            except BadRequest as error:
+                return JsonResponse({'detail': str(error)}, status=400)
+        return wrapper
+    return decorator
+
+
+def requested_fields(request):
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(POST_FIELDS)
+    fields = fields.split(',')
+    unknown = set(fields) - set(POST_FIELDS)
+    if unknown:
+        raise BadRequest(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def serialize_post(post, fields):
+    return {field: POST_FIELDS[field](post) for field in fields}
+
+
+def feed(request, posts):
+    fields = requested_fields(request)
+    order = order_fields(posts)
+    posts = posts.select_related('author', 'group').order_by(
+        *(f'-{field}' for field in order)
+    )
+    after = decode_cursor(request.GET.get('after'))
+    before = decode_cursor(request.GET.get('before'))
+    page_obj = add_cursors(cursor_page(
+        FeedPaginator(posts, settings.POSTS_NUM),
+        order,
+        after or before,
+        backwards=before is not None and after is None
+    ), order)
+    return {
+        'results': [serialize_post(post, fields) for post in page_obj],
+        'next': page_obj.next_cursor,
+        'previous': page_obj.previous_cursor,
+    }
+
+
+@api_view(lambda request: ['feed'])
+def index(request):
+    return feed(request, Post.objects.all())
+
+
+@api_view(lambda request, slug: [f'group:{slug}'])
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return {
+        'group': {
+            'slug': group.slug,
+            'title': group.title,
+            'description': group.description,
+        },
+        **feed(request, group.posts.all()),
+    }
+
+
+@api_view(lambda request, username: [f'author:{username}'])
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return {
+        'author': {
+            'username': author.username,
+            'full_name': author.get_full_name(),
+            **user_counts(author),
+        },
+        **feed(request, author.posts.all()),
+    }
+
+
+@api_view(lambda request, post_id: [f'post:{post_id}'])
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), id=post_id
+    )
+    comments = post.comments.select_related('author').order_by('created')
+    return {
+        'post': serialize_post(post, requested_fields(request)),
+        'comments': [
+            {
+                'id': comment.id,
+                'author': comment.author.username,
+                'text': comment.text,
+                'created': comment.created.isoformat(),
+            }
+            for comment in comments
+        ],
+    }
+
+
+@api_view(
+    lambda request: ['feed', f'follows:{request.user.id}'], login=True
+)
+def follow_index(request):
+    return feed(request, user_feed(request.user))
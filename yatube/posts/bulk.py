@@ -0,0 +1,117 @@
+"""Set-based moderation of many posts and comments at once.
+
+The querysets are processed in primary key chunks with plain UPDATE and
+DELETE statements, so no signals fire: counters, timelines and page
+cache versions are fixed up here for the whole batch instead. Rows that
+reference a deleted post are removed first, relation by relation.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from . import caching, counters
+from .models import Comment, Group, Post
+
+logger = logging.getLogger(__name__)
+
+
+def chunks(queryset):
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    last_id = None
+    while True:
+        page = ids if last_id is None else ids.filter(pk__gt=last_id)
+        chunk = list(page[:settings.BULK_BATCH_SIZE])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def affected(posts):
+    rows = set(posts.values_list('author_id', 'author__username', 'group_id'))
+    author_ids = {author_id for author_id, _, _ in rows}
+    group_ids = {group_id for _, _, group_id in rows} - {None}
+    return author_ids, {username for _, username, _ in rows}, group_ids
+
+
+def refresh(author_ids, usernames, group_ids, post_ids=()):
+    counters.reset([
+        'posts',
+        *(f'posts:author:{author_id}' for author_id in author_ids),
+        *(f'posts:group:{group_id}' for group_id in group_ids),
+    ])
+    slugs = Group.objects.filter(id__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    caching.bump(
+        'feed',
+        *(f'author:{username}' for username in usernames),
+        *(f'group:{slug}' for slug in slugs),
+        *(f'post:{post_id}' for post_id in post_ids)
+    )
+
+
+def move_posts(queryset, group):
+    moved = []
+    author_ids, usernames, group_ids = set(), set(), {group.id}
+    for chunk in chunks(queryset):
+        with transaction.atomic():
+            posts = Post.objects.filter(pk__in=chunk)
+            chunk_authors, chunk_names, chunk_groups = affected(posts)
+            posts.update(group=group)
+        author_ids |= chunk_authors
+        usernames |= chunk_names
+        group_ids |= chunk_groups
+        moved += chunk
+        logger.info('Перенесено постов: %s', len(moved))
+    refresh(author_ids, usernames, group_ids, moved)
+    return len(moved)
+
+
+def delete_rows(queryset):
+    """Delete through the ORM chunk by chunk, with cascades and signals."""
+    deleted = 0
+    label = queryset.model._meta.label
+    for chunk in chunks(queryset):
+        with transaction.atomic():
+            _, rows = queryset.model.objects.filter(pk__in=chunk).delete()
+        deleted += rows.get(label, 0)
+        logger.info('Удалено записей: %s', deleted)
+    return deleted
+
+
+def delete_posts(queryset):
+    deleted = []
+    author_ids, usernames, group_ids = set(), set(), set()
+    for chunk in chunks(queryset):
+        with transaction.atomic():
+            posts = Post.objects.filter(pk__in=chunk)
+            chunk_authors, chunk_names, chunk_groups = affected(posts)
+            for relation in Post._meta.related_objects:
+                relation.related_model.objects.filter(**{
+                    f'{relation.field.name}__in': chunk
+                })._raw_delete(posts.db)
+            posts._raw_delete(posts.db)
+        author_ids |= chunk_authors
+        usernames |= chunk_names
+        group_ids |= chunk_groups
+        deleted += chunk
+        logger.info('Удалено постов: %s', len(deleted))
+    refresh(author_ids, usernames, group_ids, deleted)
+    return len(deleted)
+
+
+def delete_comments(queryset):
+    deleted = 0
+    post_ids = set()
+    for chunk in chunks(queryset):
+        with transaction.atomic():
+            comments = Comment.objects.filter(pk__in=chunk)
+            chunk_posts = set(comments.values_list('post_id', flat=True))
+            deleted += comments._raw_delete(comments.db)
+            counters.recount_comments(chunk_posts)
+        post_ids |= chunk_posts
+        logger.info('Удалено комментариев: %s', deleted)
+    caching.bump_comments(post_ids)
+    return deleted
@@ -0,0 +1,99 @@
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.views.decorators.http import condition
+
+from .compression import compressed_cache_page
+from .models import Group, Post
+from .versions import bump, get_modified, get_versions
+
+
+def bump_post(post, *group_ids):
+    group_ids = {post.group_id, *group_ids} - {None}
+    slugs = Group.objects.filter(id__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    bump(
+        'feed',
+        f'author:{post.author.username}',
+        f'post:{post.id}',
+        *(f'group:{slug}' for slug in slugs)
+    )
+
+
+def bump_comments(post_ids):
+    # Feed cards show the comment count, so every feed of the posts changes.
+    rows = Post.objects.filter(pk__in=post_ids).values_list(
+        'author__username', 'group__slug'
+    )
+    usernames = {username for username, _ in rows}
+    slugs = {slug for _, slug in rows} - {None}
+    bump(
+        *(['feed'] if usernames else []),
+        *(f'author:{username}' for username in usernames),
+        *(f'group:{slug}' for slug in slugs),
+        *(f'post:{post_id}' for post_id in post_ids)
+    )
+
+
+def bump_user(user):
+    # Feed cards show the author's full name.
+    slugs = set(Post.objects.filter(author=user).values_list(
+        'group__slug', flat=True
+    ).distinct())
+    bump(
+        f'user:{user.id}',
+        f'author:{user.username}',
+        *(['feed'] if slugs else []),
+        *(f'group:{slug}' for slug in slugs - {None})
+    )
+
+
+def post_scopes(post_id):
+    # The post page also shows how many posts its author has.
+    username = cache.get_or_set(
+        f'post_author:{post_id}',
+        lambda: Post.objects.filter(pk=post_id).values_list(
+            'author__username', flat=True
+        ).first(),
+        None
+    )
+    return [f'post:{post_id}', f'author:{username}']
+
+
+def cache_versioned(timeout, scopes):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            page_scopes = scopes(**kwargs)
+            view_scopes = list(page_scopes)
+            if request.user.is_authenticated:
+                # Fragments show the user's name and follow buttons.
+                view_scopes += [
+                    f'user:{request.user.id}', f'follows:{request.user.id}'
+                ]
+            versions = get_versions(view_scopes)
+            # The page itself is the same for everyone, see fragments.
+            key_prefix = '.'.join([
+                view.__name__, *map(str, versions[:len(page_scopes)])
+            ])
+            # Validators come from the versions alone, so a revalidation
+            # is answered before the page cache or the database is hit.
+            etag = hashlib.sha1('|'.join([
+                view.__name__, *map(str, versions),
+                str(request.user.id), request.get_full_path()
+            ]).encode()).hexdigest()
+            cached_view = condition(
+                etag_func=lambda *args, **kwargs: etag,
+                last_modified_func=lambda *args, **kwargs: get_modified(
+                    view_scopes
+                )
+            )(compressed_cache_page(timeout, key_prefix)(view))
+            response = cached_view(request, *args, **kwargs)
+            if response.has_header('Content-Encoding'):
+                # Each encoding is a different representation.
+                response['ETag'] = f'W/"{etag}"'
+            return response
+        return wrapper
+    return decorator
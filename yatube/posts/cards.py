@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from .caching import get_versions
+from .thumbnails import prefetch_thumbnails
+
+
+def card_scopes(post):
+    scopes = [f'post:{post.id}', f'user:{post.author_id}']
+    if post.group:
+        scopes.append(f'group:{post.group.slug}')
+    return scopes
+
+
+def prefetch_cards(posts):
+    """Attach cached card markup to posts with two cache multi-gets."""
+    posts = list(posts)
+    scopes = [card_scopes(post) for post in posts]
+    unique = list({scope for post_scopes in scopes for scope in post_scopes})
+    versions = dict(zip(unique, get_versions(unique)))
+    for post, post_scopes in zip(posts, scopes):
+        post.card_key = 'post_card:{}:{}'.format(
+            post.id, '.'.join(str(versions[scope]) for scope in post_scopes)
+        )
+    cards = cache.get_many([post.card_key for post in posts])
+    for post in posts:
+        post.card = cards.get(post.card_key)
+    prefetch_thumbnails([post for post in posts if post.card is None])
+
+
+def render_card(post):
+    if not hasattr(post, 'card_key'):
+        prefetch_cards([post])
+    if post.card is None:
+        post.card = render_to_string('includes/post_card.html', {'post': post})
+        cache.set(post.card_key, post.card, settings.POST_CARD_TIMEOUT)
+    return post.card
@@ -0,0 +1,206 @@
+"""Page cache that keeps every response body pre-compressed.
+
+A cache hit picks the stored body matching Accept-Encoding, so serving a
+cached page to an anonymous visitor never runs a compressor. Logged in
+users get the same cached page with their own fragments stitched in.
+Expired pages are rebuilt by a single worker while the rest serve the
+stale copy.
+"""
+import gzip
+import hashlib
+import math
+import random
+import re
+import time
+from collections import Counter, namedtuple
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_response_headers, patch_vary_headers
+
+from .fragments import public_request, stitch
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first when the client accepts several.
+COMPRESSORS = {'gzip': lambda body: gzip.compress(body, mtime=0)}
+if brotli is not None:
+    COMPRESSORS = {'br': brotli.compress, **COMPRESSORS}
+IDENTITY = 'identity'
+KEPT_HEADERS = ('Content-Type', 'Content-Language', 'Expires',
+                'Cache-Control', 'Last-Modified', 'X-Frame-Options')
+CachedPage = namedtuple(
+    'CachedPage',
+    ['expires', 'delta', 'status', 'headers', 'skeleton', 'bodies']
+)
+# Page cache outcomes in this process: hit, stale, refresh and miss.
+stats = Counter()
+re_coding = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$')
+
+
+def accepted_encodings(header):
+    """Quality of each coding listed in header, zero for refused ones."""
+    qualities = {}
+    for item in header.split(','):
+        match = re_coding.match(item)
+        if match is None:
+            continue
+        coding, quality = match.groups()
+        try:
+            qualities[coding.lower()] = (
+                1.0 if quality is None else float(quality)
+            )
+        except ValueError:
+            continue
+    return qualities
+
+
+def choose_encoding(request, bodies):
+    qualities = accepted_encodings(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    )
+    for coding in COMPRESSORS:
+        # The wildcard only stands for codings the header does not name.
+        if coding in bodies and qualities.get(
+            coding, qualities.get('*', 0)
+        ) > 0:
+            return coding
+    return IDENTITY
+
+
+def compress(body):
+    bodies = {IDENTITY: body}
+    if len(body) < settings.PAGE_COMPRESS_MIN_LENGTH:
+        return bodies
+    for coding, compressor in COMPRESSORS.items():
+        compressed = compressor(body)
+        if len(compressed) < len(body):
+            bodies[coding] = compressed
+    return bodies
+
+
+def page_key(request, key_prefix):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'page:{key_prefix}:{url}'
+
+
+def build_response(request, entry):
+    if request.user.is_authenticated:
+        coding = IDENTITY
+        body = stitch(request, entry.skeleton)
+    else:
+        # Anonymous visitors all get the same fragments, stitched in and
+        # compressed once.
+        coding = choose_encoding(request, entry.bodies)
+        body = entry.bodies[coding]
+    response = HttpResponse(body, status=entry.status)
+    for header, value in entry.headers.items():
+        response[header] = value
+    if coding != IDENTITY:
+        response['Content-Encoding'] = coding
+    response['Content-Length'] = len(response.content)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def needs_refresh(entry):
+    """Expired, or picked for an early refresh.
+
+    The closer a page is to expiring and the longer it took to render,
+    the likelier a request is to rebuild it ahead of time, so rebuilds of
+    a hot page are spread out instead of all landing on its expiry.
+    """
+    early = -entry.delta * settings.PAGE_CACHE_EARLY_REFRESH * math.log(
+        1 - random.random()
+    )
+    return time.time() + early >= entry.expires
+
+
+def wait_for_page(key):
+    deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def render_page(request, view, args, kwargs, key, timeout):
+    started = time.monotonic()
+    response = view(public_request(request), *args, **kwargs)
+    if response.streaming:
+        return response
+    if (
+        response.status_code != 200 or response.cookies
+        or response.has_header('Content-Encoding')
+    ):
+        response.content = stitch(request, response.content)
+        return response
+    patch_response_headers(response, timeout)
+    entry = CachedPage(
+        expires=time.time() + timeout,
+        delta=time.monotonic() - started,
+        status=response.status_code,
+        headers={
+            header: response[header] for header in KEPT_HEADERS
+            if response.has_header(header)
+        },
+        skeleton=response.content,
+        bodies=compress(stitch(
+            public_request(request, defer=False), response.content
+        )),
+    )
+    # Kept past its expiry so it can be served while it is being rebuilt.
+    cache.set(key, entry, timeout + settings.PAGE_CACHE_STALE_TIMEOUT)
+    return build_response(request, entry)
+
+
+def compressed_cache_page(timeout, key_prefix):
+    """Like cache_page, but stores the raw and compressed bodies.
+
+    Only one worker at a time rebuilds a page, the others keep serving the
+    previous copy or, when there is none yet, wait for it for a while.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            key = page_key(request, key_prefix)
+            entry = cache.get(key)
+            if entry is not None and not needs_refresh(entry):
+                stats['hit'] += 1
+                return build_response(request, entry)
+            lock = f'lock:{key}'
+            if cache.add(lock, 1, settings.PAGE_CACHE_LOCK_TIMEOUT):
+                try:
+                    # The previous holder may have stored the page since.
+                    fresh = cache.get(key)
+                    if fresh is not None and (
+                        entry is None or fresh.expires != entry.expires
+                    ):
+                        stats['hit'] += 1
+                        return build_response(request, fresh)
+                    stats['miss' if entry is None else 'refresh'] += 1
+                    return render_page(
+                        request, view, args, kwargs, key, timeout
+                    )
+                finally:
+                    cache.delete(lock)
+            if entry is None:
+                entry = wait_for_page(key)
+                if entry is None:
+                    stats['miss'] += 1
+                    return render_page(
+                        request, view, args, kwargs, key, timeout
+                    )
+            stats['stale' if entry.expires <= time.time() else 'hit'] += 1
+            return build_response(request, entry)
+        return wrapper
+    return decorator
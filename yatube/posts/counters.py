@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Counter, Post
+
+
+def post_counter_names(author_id, group_id=None):
+    names = ['posts', f'posts:author:{author_id}']
+    if group_id:
+        names.append(f'posts:group:{group_id}')
+    return names
+
+
+def incr(names, delta=1):
+    # Missing counters are computed on the first read, so there is
+    # nothing to update until then.
+    Counter.objects.filter(name__in=names).update(value=F('value') + delta)
+
+
+def reset(names):
+    Counter.objects.filter(name__in=names).delete()
+
+
+def get_counts(querysets):
+    values = dict(
+        Counter.objects.filter(name__in=querysets).values_list('name', 'value')
+    )
+    missing = [
+        Counter(name=name, value=queryset.count())
+        for name, queryset in querysets.items() if name not in values
+    ]
+    if missing:
+        Counter.objects.bulk_create(missing, ignore_conflicts=True)
+        values.update((counter.name, counter.value) for counter in missing)
+    return values
+
+
+def get_count(name, queryset):
+    return get_counts({name: queryset})[name]
+
+
+def post_count(group=None, author=None):
+    if group is not None:
+        return get_count(f'posts:group:{group.id}', group.posts.all())
+    if author is not None:
+        return get_count(f'posts:author:{author.id}', author.posts.all())
+    return get_count('posts', Post.objects.all())
+
+
+def user_counts(user):
+    counts = get_counts({
+        f'posts:author:{user.id}': user.posts.all(),
+        f'followers:{user.id}': user.following.all(),
+        f'following:{user.id}': user.follower.all(),
+    })
+    return {
+        'posts_count': counts[f'posts:author:{user.id}'],
+        'followers_count': counts[f'followers:{user.id}'],
+        'following_count': counts[f'following:{user.id}'],
+    }
+
+
+def follow_counter_names(follow):
+    return [f'followers:{follow.author_id}', f'following:{follow.user_id}']
+
+
+def incr_comments(post_id, delta=1):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def recount_comments(post_ids):
+    comments = Comment.objects.filter(post=OuterRef('pk')).values(
+        'post'
+    ).annotate(total=Count('id')).values('total')
+    Post.objects.filter(pk__in=post_ids).update(
+        comments_count=Coalesce(Subquery(comments), 0)
+    )
+
+
+def estimated_count(queryset, limit=None):
+    # Without the ordering and annotations the count is a plain index range.
+    return queryset.order_by().values('pk')[
+        :limit or settings.POSTS_COUNT_LIMIT
+    ].count()
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .counters import get_counts
+from .following import following_ids
+from .models import Follow, Post, Timeline
+
+
+def follower_counts(author_ids):
+    counts = get_counts({
+        f'followers:{author_id}': Follow.objects.filter(author_id=author_id)
+        for author_id in author_ids
+    })
+    return {
+        author_id: counts[f'followers:{author_id}']
+        for author_id in author_ids
+    }
+
+
+def is_popular(author_id):
+    return follower_counts([author_id])[author_id] > (
+        settings.FEED_FANOUT_LIMIT
+    )
+
+
+def popular_authors(user):
+    counts = follower_counts(list(following_ids(user)))
+    return [
+        author_id for author_id, count in counts.items()
+        if count > settings.FEED_FANOUT_LIMIT
+    ]
+
+
+def add_to_timelines(user_ids, posts):
+    posts = list(posts.values_list('id', 'pub_date'))
+    Timeline.objects.bulk_create(
+        (Timeline(user_id=user_id, post_id=post_id, pub_date=pub_date)
+         for user_id in user_ids for post_id, pub_date in posts),
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def fan_out(post):
+    if is_popular(post.author_id):
+        return
+    followers = Follow.objects.filter(author_id=post.author_id).values_list(
+        'user', flat=True
+    )
+    add_to_timelines(followers.iterator(), Post.objects.filter(pk=post.pk))
+
+
+def fan_out_author(author_id):
+    """Give every follower all posts the author made while pulled."""
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user', flat=True
+    )
+    add_to_timelines(
+        followers.iterator(), Post.objects.filter(author_id=author_id)
+    )
+
+
+def backfill(follow):
+    add_to_timelines(
+        [follow.user_id], Post.objects.filter(author_id=follow.author_id)
+    )
+
+
+def prune(follow):
+    Timeline.objects.filter(
+        user_id=follow.user_id,
+        post__author_id=follow.author_id
+    ).delete()
+
+
+def pull(user, authors):
+    """Copy the new posts of popular authors into the user's timeline.
+
+    Posts from the last FEED_PULL_OVERLAP seconds are copied again, so a
+    post that commits after a read is not skipped by the next one.
+    """
+    key = f'timeline_pulled:{user.id}'
+    since = cache.get(key)
+    now = timezone.now()
+    posts = Post.objects.filter(author__in=authors)
+    if since is not None:
+        posts = posts.filter(pub_date__gte=since)
+    add_to_timelines([user.id], posts)
+    cache.set(key, now - timedelta(seconds=settings.FEED_PULL_OVERLAP), None)
+
+
+def user_feed(user):
+    pulled = popular_authors(user)
+    if pulled:
+        pull(user, pulled)
+    # Both order fields come from the timeline, so its index gives the order.
+    return Post.objects.filter(timeline__user=user).annotate(
+        feed_date=F('timeline__pub_date'), feed_post=F('timeline__post_id')
+    ).order_by('-feed_date', '-feed_post')
@@ -0,0 +1,41 @@
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+
+from .models import Follow
+from .versions import get_versions
+
+
+def following_key(user_id):
+    # A set loaded before a follow change is stored under the old version
+    # and never read again.
+    version, = get_versions([f'follows:{user_id}'])
+    return f'following_ids:{user_id}:{version}'
+
+
+def following_ids(user):
+    """Sorted ids of the authors user follows, loaded once per request."""
+    if not hasattr(user, '_following_ids'):
+        ids = array('q')
+        key = following_key(user.id)
+        raw = cache.get(key)
+        if raw is None:
+            ids.extend(sorted(
+                Follow.objects.filter(user=user).values_list(
+                    'author_id', flat=True
+                )
+            ))
+            cache.set(key, ids.tobytes(), None)
+        else:
+            ids.frombytes(raw)
+        user._following_ids = ids
+    return user._following_ids
+
+
+def is_following(user, author_id):
+    if not user.is_authenticated:
+        return False
+    ids = following_ids(user)
+    index = bisect_left(ids, author_id)
+    return index < len(ids) and ids[index] == author_id
@@ -1,6 +1,12 @@
+from functools import partial
+
 from django import forms
+from django.conf import settings
+from django.db import transaction
+from django.template.defaultfilters import filesizeformat
 
-from .models import Comment, Post
+from .images import enqueue_image
+from .models import Comment, Group, Post
 
 
 class PostForm(forms.ModelForm):
@@ -8,8 +14,49 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, stopped_uploads=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stopped_uploads = stopped_uploads
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if 'image' in self.stopped_uploads or (
+            image and image.size > settings.POST_IMAGE_MAX_SIZE
+        ):
+            raise forms.ValidationError(
+                'Картинка больше '
+                f'{filesizeformat(settings.POST_IMAGE_MAX_SIZE)}'
+            )
+        return image
+
+    def save(self, commit=True):
+        post = super().save(commit)
+        if commit and post.image and 'image' in self.changed_data:
+            transaction.on_commit(partial(enqueue_image, post.id))
+        return post
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class ConfirmForm(forms.Form):
+    pass
+
+
+class GroupChoiceForm(forms.Form):
+    group = forms.ModelChoiceField(Group.objects.all(), label='Группа')
+
+
+class DateRangeForm(forms.Form):
+    start = forms.DateField(label='С')
+    end = forms.DateField(label='По')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        if start and end and start > end:
+            raise forms.ValidationError('Начало позже конца диапазона')
+        return cleaned_data
@@ -0,0 +1,96 @@
+"""Parts of the cached pages that depend on who is looking.
+
+Cached pages are rendered once for everyone, with a placeholder wherever
+a fragment goes, and every response gets the fragments of its own user
+stitched in.
+"""
+import copy
+import re
+from urllib.parse import quote, unquote
+
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import render_to_string
+
+from .following import is_following
+from .forms import CommentForm
+
+FRAGMENTS = {}
+re_placeholder = re.compile(r'<!--fragment:([^>]*)-->')
+
+
+def fragment(template_name):
+    def decorator(func):
+        FRAGMENTS[func.__name__] = (template_name, func)
+        return func
+    return decorator
+
+
+@fragment('includes/header.html')
+def header(request):
+    return {}
+
+
+@fragment('includes/switcher.html')
+def switcher(request):
+    return {}
+
+
+@fragment('includes/follow_button.html')
+def follow_button(request, author_id, username):
+    author_id = int(author_id)
+    user = request.user
+    return {
+        'author': username,
+        'show': user.is_authenticated and user.id != author_id,
+        'following': is_following(user, author_id),
+    }
+
+
+@fragment('includes/profile_follow.html')
+def profile_follow(request, author_id, username):
+    return {
+        'username': username,
+        'following': is_following(request.user, int(author_id)),
+    }
+
+
+@fragment('includes/post_actions.html')
+def post_actions(request, post_id, author_id):
+    return {
+        'post_id': int(post_id),
+        'is_author': request.user.id == int(author_id),
+        'form': CommentForm(),
+    }
+
+
+def render_fragment(request, name, *args):
+    template_name, func = FRAGMENTS[name]
+    return render_to_string(
+        template_name, func(request, *args), request=request
+    )
+
+
+def placeholder(name, *args):
+    return '<!--fragment:{}-->'.format(
+        ':'.join(quote(str(arg), safe='') for arg in (name, *args))
+    )
+
+
+def public_request(request, defer=True):
+    """A copy of request that renders the same for every visitor."""
+    public = copy.copy(request)
+    public.user = AnonymousUser()
+    public.defer_fragments = defer
+    return public
+
+
+def stitch(request, body):
+    rendered = {}
+
+    def replace(match):
+        if match.group(1) not in rendered:
+            rendered[match.group(1)] = render_fragment(
+                request, *map(unquote, match.group(1).split(':'))
+            )
+        return rendered[match.group(1)]
+    return re_placeholder.sub(replace, body.decode()).encode()
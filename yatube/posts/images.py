@@ -0,0 +1,96 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection
+from PIL import Image, ImageOps
+
+from .models import Post
+from .thumbnails import generate_thumbnails, get_executor
+
+logger = logging.getLogger(__name__)
+_pool = None
+# Formats kept as uploaded when they need no other normalization.
+WEB_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _pool
+
+
+def normalize_image(source, target, max_side, quality):
+    """Write a normalized copy of source to target.
+
+    Returns the extension for the new file or None when the original is
+    already fine. Runs in a worker process, so it must not touch Django.
+    """
+    with Image.open(source) as image:
+        if getattr(image, 'is_animated', False):
+            return None
+        oversized = max(image.size) > max_side
+        if image.format in WEB_FORMATS and not oversized and (
+            not image.getexif()
+        ):
+            return None
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+            image.convert('RGBA').save(target, 'PNG', optimize=True)
+            return '.png'
+        image.convert('RGB').save(
+            target, 'JPEG', quality=quality, optimize=True, progressive=True
+        )
+    return '.jpg'
+
+
+def ingest_image(post_id, submit=None):
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    name = post.image.name
+    source = default_storage.path(name)
+    target = f'{source}.part'
+    args = (
+        source, target,
+        settings.POST_IMAGE_MAX_SIDE, settings.POST_IMAGE_QUALITY
+    )
+    try:
+        if submit is None:
+            extension = normalize_image(*args)
+        else:
+            extension = submit(normalize_image, *args).result()
+        if extension is not None:
+            with open(target, 'rb') as normalized:
+                new_name = default_storage.save(
+                    os.path.splitext(name)[0] + extension, File(normalized)
+                )
+            updated = Post.objects.filter(pk=post_id, image=name).update(
+                image=new_name
+            )
+            default_storage.delete(name if updated else new_name)
+    except Exception:
+        logger.exception('Не удалось обработать картинку поста %s', post_id)
+    finally:
+        if os.path.exists(target):
+            os.remove(target)
+    generate_thumbnails(post_id)
+
+
+def ingest_in_worker(post_id):
+    try:
+        ingest_image(post_id, submit=get_pool().submit)
+    finally:
+        connection.close()
+
+
+def enqueue_image(post_id):
+    if settings.THUMBNAIL_ASYNC:
+        get_executor().submit(ingest_in_worker, post_id)
+    else:
+        ingest_image(post_id)
@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.images import ingest_in_worker
+from posts.models import PendingImage, Post
+from posts.thumbnails import cached_thumbnails, generate_in_worker
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие миниатюры картинок постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.THUMBNAIL_WORKERS,
+            help='Число потоков обработки.'
+        )
+        parser.add_argument(
+            '--watch',
+            type=int,
+            default=0,
+            metavar='SECONDS',
+            help='Работать постоянно, проверяя новые картинки каждые SECONDS.'
+        )
+
+    def handle(self, *args, **options):
+        self.running = set()
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            self.sweep(executor)
+            self.sweep_pending(executor)
+            while options['watch']:
+                time.sleep(options['watch'])
+                # Fresh uploads are left to the web workers for a while.
+                self.sweep_pending(executor, options['watch'])
+
+    def submit(self, executor, func, post_id):
+        if post_id in self.running:
+            return False
+        self.running.add(post_id)
+        executor.submit(func, post_id).add_done_callback(
+            lambda future: self.running.discard(post_id)
+        )
+        return True
+
+    def sweep(self, executor):
+        posts = Post.objects.exclude(image='').order_by('id').values_list(
+            'id', 'image'
+        )
+        queued = 0
+        for post_id, image in posts.iterator():
+            if None in cached_thumbnails(image).values():
+                queued += self.submit(executor, generate_in_worker, post_id)
+        self.stdout.write(f'Поставлено в очередь постов: {queued}')
+
+    def sweep_pending(self, executor, min_age=0):
+        pending = PendingImage.objects.filter(
+            created__lte=timezone.now() - timedelta(seconds=min_age)
+        ).order_by('id').values_list('post_id', flat=True)
+        queued = 0
+        for post_id in pending:
+            queued += self.submit(executor, ingest_in_worker, post_id)
+        if queued:
+            self.stdout.write(f'Поставлено в очередь картинок: {queued}')
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.snapshots import publish_all
+
+
+class Command(BaseCommand):
+    help = 'Публикует статические копии публичных страниц.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles',
+            type=int,
+            default=settings.SNAPSHOT_PROFILES,
+            help='Сколько самых популярных профилей опубликовать.'
+        )
+
+    def handle(self, *args, **options):
+        published = publish_all(options['profiles'])
+        self.stdout.write(f'Опубликовано страниц: {published}')
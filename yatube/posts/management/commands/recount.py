@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import Comment, Counter, Follow, Post
+
+
+def actual_counters():
+    counters = {'posts': Post.objects.count()}
+    queries = (
+        ('posts:author:{}', Post.objects.values_list('author')),
+        ('posts:group:{}', Post.objects.filter(
+            group__isnull=False
+        ).values_list('group')),
+        ('followers:{}', Follow.objects.values_list('author')),
+        ('following:{}', Follow.objects.values_list('user')),
+    )
+    for template, rows in queries:
+        for key, total in rows.annotate(total=Count('id')).order_by():
+            counters[template.format(key)] = total
+    return counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, подписок и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения.'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.repair_counters(dry_run)
+        self.repair_comments(dry_run)
+
+    def repair_counters(self, dry_run):
+        actual = actual_counters()
+        stored = dict(Counter.objects.values_list('name', 'value'))
+        # Only existing rows can drift; missing ones are computed on read,
+        # and a stored counter whose rows are all gone must drop to zero.
+        drifted = {
+            name: actual.get(name, 0)
+            for name, value in stored.items()
+            if actual.get(name, 0) != value
+        }
+        if not dry_run:
+            for name, value in drifted.items():
+                Counter.objects.filter(name=name).update(value=value)
+        self.stdout.write(f'Счётчиков с расхождением: {len(drifted)}')
+
+    def repair_comments(self, dry_run):
+        comments = Comment.objects.filter(post=OuterRef('pk')).values(
+            'post'
+        ).annotate(total=Count('id')).values('total')
+        drifted = Post.objects.annotate(
+            actual=Coalesce(Subquery(comments), 0)
+        ).exclude(comments_count=F('actual'))
+        total = drifted.count()
+        if not dry_run and total:
+            Post.objects.filter(
+                pk__in=drifted.values('pk')
+            ).update(comments_count=Coalesce(Subquery(comments), 0))
+        self.stdout.write(f'Постов с неверным числом комментариев: {total}')
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_timeline(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    Timeline = apps.get_model('posts', 'Timeline')
+    for follow in Follow.objects.iterator():
+        posts = Post.objects.filter(author_id=follow.author_id).values_list(
+            'id', 'pub_date'
+        )
+        Timeline.objects.bulk_create(
+            (Timeline(user_id=follow.user_id, post_id=post_id, pub_date=date)
+             for post_id, date in posts.iterator()),
+            batch_size=500,
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0021_remove_post_follow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Timeline',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to='posts.Post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='timeline',
+            index=models.Index(fields=['user', '-pub_date'], name='timeline_user_pub_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='timeline',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_post'),
+        ),
+        migrations.RunPython(backfill_timeline, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Comment = apps.get_model('posts', 'Comment')
+    Post = apps.get_model('posts', 'Post')
+    comments = Comment.objects.filter(post=OuterRef('pk')).values(
+        'post'
+    ).annotate(total=Count('id')).values('total')
+    Post.objects.update(comments_count=Coalesce(Subquery(comments), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE posts_post_fts USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_insert AFTER INSERT ON posts_post BEGIN
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_delete AFTER DELETE ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_update AFTER UPDATE OF text ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')",
+]
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS posts_post_fts_insert',
+    'DROP TRIGGER IF EXISTS posts_post_fts_delete',
+    'DROP TRIGGER IF EXISTS posts_post_fts_update',
+    'DROP TABLE IF EXISTS posts_post_fts',
+]
+
+
+def run_on_sqlite(statements):
+    # The index is SQLite-only, other databases fall back to LIKE search.
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            for sql in statements:
+                schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0024_post_comments_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)
+        ),
+    ]
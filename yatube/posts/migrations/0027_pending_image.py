@@ -0,0 +1,22 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0026_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingImage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pending_image', to='posts.Post')),
+            ],
+        ),
+    ]
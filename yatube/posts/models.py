@@ -2,6 +2,8 @@ from django.contrib.auth import get_user_model
 from django.db import models
 
 User = get_user_model()
+# Admin selects and links show objects by this much of their text.
+STR_LENGTH = 15
 
 
 class Post(models.Model):
@@ -32,12 +34,29 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         ordering = ['-pub_date']
+        # Feeds are ordered by ('-pub_date', '-pk'), see utils.pages.
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'], name='post_pub_date'),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date'
+            ),
+        ]
 
     def __str__(self):
-        return self.text
+        return self.text[:STR_LENGTH]
 
 
 class Comment(models.Model):
@@ -60,8 +79,15 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created'], name='comment_post_created'
+            ),
+        ]
+
     def __str__(self):
-        return self.text
+        return self.text[:STR_LENGTH]
 
 
 class Group(models.Model):
@@ -96,3 +122,63 @@ class Follow(models.Model):
                 name='not_sub'
             )
         ]
+        # Fan-out reads the followers of an author from the index alone.
+        indexes = [
+            models.Index(
+                fields=['author', 'user'], name='follow_author_user'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+
+class Counter(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    value = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
+
+
+class PendingImage(models.Model):
+    """A post image that still waits for its normalization and thumbnails."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='pending_image',
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.post_id}: {self.created:%Y-%m-%d %H:%M}'
+
+
+class Timeline(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_post'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_pub_date_post'
+            ),
+        ]
@@ -0,0 +1,46 @@
+import re
+
+from django.db import connection
+
+from .models import Post
+
+MATCH_SQL = 'SELECT rowid FROM posts_post_fts WHERE posts_post_fts MATCH %s'
+# SQLite ends a string at NUL, so control characters never reach MATCH.
+re_control = re.compile(r'[\x00-\x1f\x7f]')
+
+
+def fts_query(query):
+    """Quote every word, so user input never reaches FTS5 syntax."""
+    words = re_control.sub(' ', query).split()
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def filter_posts(posts, query):
+    if connection.vendor != 'sqlite':
+        return posts.filter(text__icontains=query)
+    terms = fts_query(query)
+    if not terms:
+        return posts.none()
+    # RawSQL inside id__in is wrapped in a second pair of parentheses,
+    # which SQLite reads as a scalar subquery, so spell the IN out.
+    return posts.extra(
+        where=[f'posts_post.id IN ({MATCH_SQL})'], params=[terms]
+    )
+
+
+def search_posts(query):
+    """Posts matching all words of query, best matches first."""
+    if connection.vendor != 'sqlite':
+        return Post.objects.filter(text__icontains=query).order_by(
+            '-pub_date', '-pk'
+        )
+    terms = fts_query(query)
+    if not terms:
+        return Post.objects.none()
+    return Post.objects.extra(
+        select={'rank': 'bm25(posts_post_fts)'},
+        tables=['posts_post_fts'],
+        where=['posts_post_fts.rowid = posts_post.id',
+               'posts_post_fts MATCH %s'],
+        params=[terms],
+    ).order_by('rank', '-pk')
@@ -0,0 +1,189 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.urls import reverse
+
+from . import caching, counters, feed, snapshots
+from .models import Comment, Follow, Group, PendingImage, Post, User
+
+
+@receiver(pre_save, sender=Post)
+def remember_saved_post(sender, instance, **kwargs):
+    if instance.pk:
+        instance._saved_group_id, instance._saved_image = (
+            Post.objects.filter(pk=instance.pk).values_list(
+                'group_id', 'image'
+            ).first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Post)
+def track_new_image(sender, instance, created, **kwargs):
+    # Kept until the thumbnails exist, so no restart loses the work.
+    if instance.image and (
+        created or instance.image.name != getattr(
+            instance, '_saved_image', None
+        )
+    ):
+        PendingImage.objects.get_or_create(post=instance)
+
+
+@receiver(pre_save, sender=Group)
+def remember_slug(sender, instance, **kwargs):
+    if instance.pk:
+        instance._saved_slug = Group.objects.filter(
+            pk=instance.pk
+        ).values_list('slug', flat=True).first()
+
+
+def group_slugs(group):
+    # After a rename the pages under the old slug are gone as well.
+    return {group.slug, getattr(group, '_saved_slug', None)} - {None}
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created:
+        feed.fan_out(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, created, **kwargs):
+    if created:
+        counters.incr(
+            counters.post_counter_names(instance.author_id, instance.group_id)
+        )
+        return
+    saved_group_id = getattr(instance, '_saved_group_id', None)
+    if saved_group_id != instance.group_id:
+        if saved_group_id:
+            counters.incr([f'posts:group:{saved_group_id}'], -1)
+        if instance.group_id:
+            counters.incr([f'posts:group:{instance.group_id}'])
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    counters.incr(
+        counters.post_counter_names(instance.author_id, instance.group_id),
+        -1
+    )
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_counter(sender, instance, **kwargs):
+    counters.reset([f'posts:group:{instance.id}'])
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.incr_comments(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    counters.incr_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        counters.incr(counters.follow_counter_names(instance))
+
+
+@receiver(post_delete, sender=Follow)
+def uncount_follow(sender, instance, **kwargs):
+    counters.incr(counters.follow_counter_names(instance), -1)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        feed.backfill(instance)
+
+
+@receiver(pre_delete, sender=Follow)
+def remember_popularity(sender, instance, **kwargs):
+    instance._author_was_popular = feed.is_popular(instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline(sender, instance, **kwargs):
+    feed.prune(instance)
+    if getattr(instance, '_author_was_popular', False) and (
+        not feed.is_popular(instance.author_id)
+    ):
+        feed.fan_out_author(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_versions(sender, instance, **kwargs):
+    caching.bump_post(
+        instance, getattr(instance, '_saved_group_id', None)
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_versions(sender, instance, **kwargs):
+    caching.bump_comments([instance.post_id])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def bump_group_versions(sender, instance, **kwargs):
+    caching.bump(
+        'feed', *(f'group:{slug}' for slug in group_slugs(instance))
+    )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def bump_follow_versions(sender, instance, **kwargs):
+    caching.bump(
+        f'author:{instance.author.username}',
+        f'author:{instance.user.username}',
+        f'follows:{instance.user_id}'
+    )
+    # A request between this bump and the commit may cache the old
+    # following set under the new version.
+    transaction.on_commit(partial(
+        caching.bump, f'follows:{instance.user_id}'
+    ))
+
+
+@receiver(post_save, sender=User)
+def bump_user_versions(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    caching.bump_user(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def publish_post_snapshots(sender, instance, **kwargs):
+    if settings.SNAPSHOT_PUBLISH:
+        transaction.on_commit(partial(
+            snapshots.enqueue, snapshots.publish_post,
+            instance.author.username,
+            [instance.group_id, getattr(instance, '_saved_group_id', None)]
+        ))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def publish_group_snapshots(sender, instance, **kwargs):
+    if settings.SNAPSHOT_PUBLISH:
+        transaction.on_commit(partial(
+            snapshots.enqueue, snapshots.publish, [
+                reverse('posts:index'),
+                *(reverse('posts:group_list', args=[slug])
+                  for slug in group_slugs(instance)),
+            ]
+        ))
@@ -0,0 +1,183 @@
+"""Static copies of the public first pages for the front web server.
+
+Pages are written as <path>/index.html, with .gz (and .br) siblings, into
+a generation directory that SNAPSHOT_DIR/current links to. The front
+server answers anonymous requests without a query string from there and
+passes everything else on to Django.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.db.models import Count
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from .compression import IDENTITY, compress
+from .models import Group, User
+
+logger = logging.getLogger(__name__)
+_executor = None
+SUFFIXES = {IDENTITY: '', 'gzip': '.gz', 'br': '.br'}
+
+
+def current_dir():
+    return os.path.join(settings.SNAPSHOT_DIR, 'current')
+
+
+def page_file(root, path):
+    return os.path.join(root, path.strip('/'), 'index.html')
+
+
+def popular_authors(limit):
+    return User.objects.annotate(
+        followers=Count('following')
+    ).order_by('-followers', 'username').values_list(
+        'username', flat=True
+    )[:limit]
+
+
+def snapshot_paths(profiles):
+    yield reverse('posts:index')
+    for slug in Group.objects.values_list('slug', flat=True):
+        yield reverse('posts:group_list', args=[slug])
+    for username in popular_authors(profiles):
+        yield reverse('posts:profile', args=[username])
+
+
+def render_page(path):
+    """The page as an anonymous visitor gets it, None if it is gone."""
+    request = RequestFactory(SERVER_NAME=settings.SNAPSHOT_HOST).get(path)
+    request.user = AnonymousUser()
+    request.resolver_match = match = resolve(path)
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Http404:
+        return None
+    if response.status_code != 200:
+        return None
+    return compress(response.content)
+
+
+def write_atomic(filename, content):
+    directory = os.path.dirname(filename)
+    os.makedirs(directory, exist_ok=True)
+    handle, temp = tempfile.mkstemp(dir=directory, prefix='.')
+    with os.fdopen(handle, 'wb') as file:
+        file.write(content)
+    os.chmod(temp, 0o644)
+    os.replace(temp, filename)
+
+
+def write_page(root, path, bodies):
+    filename = page_file(root, path)
+    for coding, suffix in SUFFIXES.items():
+        if coding in bodies:
+            write_atomic(filename + suffix, bodies[coding])
+        elif os.path.exists(filename + suffix):
+            os.remove(filename + suffix)
+
+
+def remove_page(root, path):
+    filename = page_file(root, path)
+    for suffix in SUFFIXES.values():
+        if os.path.exists(filename + suffix):
+            os.remove(filename + suffix)
+    directory = os.path.dirname(filename)
+    while directory != root and os.path.isdir(directory) and (
+        not os.listdir(directory)
+    ):
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
+
+def publish_all(profiles=None):
+    """Render every snapshot into a new generation and switch to it."""
+    if profiles is None:
+        profiles = settings.SNAPSHOT_PROFILES
+    os.makedirs(settings.SNAPSHOT_DIR, exist_ok=True)
+    generation = tempfile.mkdtemp(
+        dir=settings.SNAPSHOT_DIR, prefix=time.strftime('%Y%m%d%H%M%S-')
+    )
+    os.chmod(generation, 0o755)
+    published = 0
+    for path in snapshot_paths(profiles):
+        bodies = render_page(path)
+        if bodies is not None:
+            write_page(generation, path, bodies)
+            published += 1
+    link = current_dir()
+    temp_link = f'{link}.{os.getpid()}'
+    os.symlink(os.path.basename(generation), temp_link)
+    os.replace(temp_link, link)
+    for name in os.listdir(settings.SNAPSHOT_DIR):
+        path = os.path.join(settings.SNAPSHOT_DIR, name)
+        if path != generation and os.path.isdir(path) and (
+            not os.path.islink(path)
+        ):
+            shutil.rmtree(path, ignore_errors=True)
+    return published
+
+
+def publish(paths):
+    """Refresh the given pages of the current generation.
+
+    Profiles are only refreshed if the last full publication included them.
+    """
+    root = os.path.realpath(current_dir())
+    if not os.path.isdir(root):
+        return
+    for path in paths:
+        if resolve(path).url_name == 'profile' and not os.path.exists(
+            page_file(root, path)
+        ):
+            continue
+        bodies = render_page(path)
+        if bodies is None:
+            remove_page(root, path)
+        else:
+            write_page(root, path, bodies)
+
+
+def publish_post(username, group_ids):
+    slugs = Group.objects.filter(id__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    publish([
+        reverse('posts:index'),
+        reverse('posts:profile', args=[username]),
+        *(reverse('posts:group_list', args=[slug]) for slug in slugs),
+    ])
+
+
+def publish_in_worker(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Не удалось обновить статические страницы')
+    finally:
+        connection.close()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # A single worker writes the updates of a page in order.
+        _executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='snapshots'
+        )
+    return _executor
+
+
+def enqueue(func, *args):
+    if settings.SNAPSHOT_ASYNC:
+        get_executor().submit(publish_in_worker, func, *args)
+    else:
+        func(*args)
@@ -0,0 +1,14 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..fragments import placeholder, render_fragment
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def fragment(context, name, *args):
+    request = context['request']
+    if getattr(request, 'defer_fragments', False):
+        return mark_safe(placeholder(name, *args))
+    return render_fragment(request, name, *args)
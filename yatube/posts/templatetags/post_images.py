@@ -0,0 +1,38 @@
+from django import template
+from django.conf import settings
+
+from ..thumbnails import cached_thumbnails, thumbnail_specs
+
+register = template.Library()
+
+
+def srcset(images):
+    return ', '.join(f'{image.url} {image.width}w' for image in images)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, variant='card'):
+    context = {'post': post}
+    if not post.image:
+        return context
+    thumbnails = getattr(post, 'thumbnails', None)
+    if thumbnails is None:
+        thumbnails = cached_thumbnails(post.image)
+    formats = {}
+    for name, (group, image_format, _, _) in thumbnail_specs().items():
+        if group != variant:
+            continue
+        if thumbnails[name] is None:
+            return context
+        formats.setdefault(image_format, []).append(thumbnails[name])
+    *modern, (_, images) = formats.items()
+    return {
+        **context,
+        'sources': [
+            {'type': f'image/{image_format.lower()}', 'srcset': srcset(found)}
+            for image_format, found in modern
+        ],
+        'image': images[len(images) // 2],
+        'srcset': srcset(images),
+        'sizes': settings.POST_IMAGE_VARIANTS[variant]['sizes'],
+    }
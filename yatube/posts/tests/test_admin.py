@@ -0,0 +1,223 @@
+from unittest import mock
+
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import bulk
+from ..admin import PostAdmin
+from ..caching import get_versions
+from ..counters import post_count, user_counts
+from ..models import (Comment, Follow, Group, PendingImage, Post,
+                      Timeline)
+
+User = get_user_model()
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.create_posts(2)
+
+    @classmethod
+    def create_posts(cls, num):
+        for i in range(num):
+            Post.objects.create(
+                author=cls.admin, text=f'Текст {i}', group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, **params):
+        address = reverse('admin:posts_post_changelist')
+        self.client.get(address, params)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(address, params)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries]
+
+    def test_changelist_query_count_is_constant(self):
+        for params in ({}, {'q': 'Текст'}, {'pub_date__year': 2020}):
+            with self.subTest(params=params):
+                few = self.changelist_queries(**params)
+                self.create_posts(20)
+                many = self.changelist_queries(**params)
+                self.assertEqual(len(many), len(few))
+        self.assertFalse(
+            any('COUNT(' in sql for sql in self.changelist_queries())
+        )
+
+    @override_settings(POSTS_COUNT_LIMIT=3, PAGE_RANGE_ON_EACH_SIDE=1)
+    def test_filtered_changelist_pages_past_estimate(self):
+        self.create_posts(20)
+        with mock.patch.object(PostAdmin, 'list_per_page', 2):
+            response = self.client.get(
+                reverse('admin:posts_post_changelist'),
+                {'pub_date__year': timezone.now().year, 'p': 5}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 2)
+        self.assertContains(response, '14+')
+
+    def test_changelist_renders_row_group_without_queries(self):
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertContains(
+            response,
+            f'<option value="{self.group.pk}" selected>{self.group}</option>'
+        )
+
+
+class RelatedAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Длинный текст {i}')
+            for i in range(25)
+        ]
+        cls.comment = Comment.objects.create(
+            post=cls.posts[0], author=cls.author, text='Комментарий'
+        )
+        cls.follow = Follow.objects.create(user=cls.admin, author=cls.author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_change_forms_render_only_selected_objects(self):
+        pages = {
+            'admin:posts_comment_change': self.comment.pk,
+            'admin:posts_follow_change': self.follow.pk,
+        }
+        for name, pk in pages.items():
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=[pk]))
+                self.assertContains(response, 'admin-autocomplete')
+        response = self.client.get(
+            reverse('admin:posts_comment_change', args=[self.comment.pk])
+        )
+        self.assertContains(response, '<option', count=2)
+
+    def test_post_autocomplete_is_searched_and_paginated(self):
+        response = self.client.get(
+            reverse('admin:posts_post_autocomplete'), {'term': 'текст'}
+        )
+        data = response.json()
+        self.assertEqual(len(data['results']), 20)
+        self.assertTrue(data['pagination']['more'])
+        self.assertEqual(data['results'][0]['text'], 'Длинный текст 2')
+
+
+@override_settings(BULK_BATCH_SIZE=2)
+class BulkActionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.group = Group.objects.create(title='Старая', slug='old')
+        cls.other_group = Group.objects.create(title='Новая', slug='new')
+        Follow.objects.create(user=cls.admin, author=cls.spammer)
+        cls.spam = [
+            Post.objects.create(
+                author=cls.spammer, text=f'Спам {i}', group=cls.group
+            )
+            for i in range(5)
+        ]
+        cls.post = Post.objects.create(
+            author=cls.admin, text='Пост', group=cls.group
+        )
+        for post in (cls.spam[0], cls.post):
+            Comment.objects.create(post=post, author=cls.spammer, text='Спам')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def act(self, model, action, selected, **data):
+        address = reverse(f'admin:posts_{model}_changelist')
+        params = {
+            'action': action,
+            helpers.ACTION_CHECKBOX_NAME: [obj.pk for obj in selected],
+        }
+        response = self.client.post(address, params)
+        self.assertTemplateUsed(response, 'admin/posts/bulk_action.html')
+        return self.client.post(address, {**params, **data, 'apply': 1})
+
+    def test_move_to_group(self):
+        post_count(group=self.group)
+        self.act(
+            'post', 'move_to_group', self.spam, group=self.other_group.pk
+        )
+        self.assertEqual(post_count(group=self.group), 1)
+        self.assertEqual(post_count(group=self.other_group), 5)
+        self.assertFalse(Post.objects.filter(
+            id__in=[post.id for post in self.spam], group=self.group
+        ).exists())
+
+    def test_delete_by_author(self):
+        self.assertEqual(post_count(), 6)
+        self.act('post', 'delete_by_author', self.spam[:1])
+        self.assertEqual(list(Post.objects.all()), [self.post])
+        self.assertEqual(post_count(), 1)
+        self.assertEqual(post_count(group=self.group), 1)
+        self.assertFalse(Timeline.objects.exists())
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_delete_post_with_pending_image(self):
+        PendingImage.objects.create(post=self.spam[1])
+        self.act('post', 'delete_in_bulk', self.spam[1:2])
+        self.assertFalse(Post.objects.filter(id=self.spam[1].id).exists())
+        self.assertFalse(PendingImage.objects.exists())
+
+    def test_delete_bumps_post_versions(self):
+        scopes = [f'post:{self.spam[1].id}', 'author:spammer', 'group:old']
+        versions = get_versions(scopes)
+        self.act('post', 'delete_in_bulk', self.spam[1:2])
+        for scope, old, new in zip(scopes, versions, get_versions(scopes)):
+            with self.subTest(scope=scope):
+                self.assertNotEqual(new, old)
+
+    def test_default_bulk_delete_runs_signals(self):
+        self.assertEqual(user_counts(self.spammer)['followers_count'], 1)
+        self.assertEqual(bulk.delete_rows(Follow.objects.all()), 1)
+        self.assertEqual(user_counts(self.spammer)['followers_count'], 0)
+        self.assertFalse(Timeline.objects.exists())
+
+    def test_delete_comments_by_date_range(self):
+        today = timezone.localdate()
+        scopes = ['feed', 'author:admin', 'group:old', f'post:{self.post.id}']
+        versions = get_versions(scopes)
+        self.act(
+            'comment', 'delete_by_date_range', Comment.objects.all()[:1],
+            start=today, end=today
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(Post.objects.get(id=self.post.id).comments_count, 0)
+        for scope, old, new in zip(scopes, versions, get_versions(scopes)):
+            with self.subTest(scope=scope):
+                self.assertNotEqual(new, old)
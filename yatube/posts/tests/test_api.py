@@ -0,0 +1,158 @@
+import base64
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+from ..utils import encode_cursor
+
+User = get_user_model()
+
+
+@override_settings(POSTS_NUM=3)
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for i in range(5):
+            cls.post = Post.objects.create(
+                author=cls.author, text=f'Текст {i}', group=cls.group
+            )
+        Comment.objects.create(post=cls.post, author=cls.user, text='Ок')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_are_paginated_by_cursor(self):
+        addresses = [
+            reverse('api:index'),
+            reverse('api:group_list', args=[self.group.slug]),
+            reverse('api:profile', args=[self.author.username]),
+        ]
+        for address in addresses:
+            with self.subTest(address=address):
+                first = self.client.get(address).json()
+                self.assertEqual(
+                    [post['text'] for post in first['results']],
+                    ['Текст 4', 'Текст 3', 'Текст 2']
+                )
+                self.assertIsNone(first['previous'])
+                second = self.client.get(
+                    address, {'after': first['next']}
+                ).json()
+                self.assertEqual(
+                    [post['text'] for post in second['results']],
+                    ['Текст 1', 'Текст 0']
+                )
+                self.assertIsNone(second['next'])
+                back = self.client.get(
+                    address, {'before': second['previous']}
+                ).json()
+                self.assertEqual(back['results'], first['results'])
+
+    def test_broken_cursor_opens_first_page(self):
+        token = base64.urlsafe_b64encode(b'garbage|5').decode()
+        response = self.client.get(reverse('api:index'), {'after': token})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['previous'])
+
+    def test_exhausted_cursor_opens_first_page(self):
+        posts = Post.objects.order_by('pub_date', 'pk')
+        oldest, newest = posts.first(), posts.last()
+        first = self.client.get(reverse('api:index')).json()
+        cursors = {
+            'after': encode_cursor(
+                oldest.pub_date - timedelta(days=1), oldest.pk
+            ),
+            'before': encode_cursor(
+                newest.pub_date + timedelta(days=1), newest.pk
+            ),
+        }
+        for direction, token in cursors.items():
+            with self.subTest(direction=direction):
+                response = self.client.get(
+                    reverse('api:index'), {direction: token}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), first)
+
+    def test_sparse_fields(self):
+        response = self.client.get(
+            reverse('api:index'), {'fields': 'id,author'}
+        )
+        self.assertEqual(
+            response.json()['results'][0],
+            {'id': self.post.id, 'author': 'author'}
+        )
+        response = self.client.get(reverse('api:index'), {'fields': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_detail_with_comments(self):
+        data = self.client.get(
+            reverse('api:post_detail', args=[self.post.id])
+        ).json()
+        self.assertEqual(data['post']['group'], self.group.slug)
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']], ['Ок']
+        )
+
+    def test_comments_change_feed_etags(self):
+        client = Client()
+        client.force_login(self.user)
+        addresses = [
+            reverse('api:index'),
+            reverse('api:group_list', args=[self.group.slug]),
+            reverse('api:profile', args=[self.author.username]),
+            reverse('api:follow_index'),
+        ]
+        etags = {address: client.get(address)['ETag'] for address in addresses}
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text='Ещё'
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                response = client.get(
+                    address, HTTP_IF_NONE_MATCH=etags[address]
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.json()['results'][0]['comments_count'], 2
+                )
+                etags[address] = response['ETag']
+        comment.delete()
+        for address in addresses:
+            with self.subTest(address=address):
+                response = client.get(
+                    address, HTTP_IF_NONE_MATCH=etags[address]
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_follow_feed_requires_login(self):
+        address = reverse('api:follow_index')
+        self.assertEqual(self.client.get(address).status_code, 401)
+        client = Client()
+        client.force_login(self.user)
+        self.assertEqual(len(client.get(address).json()['results']), 3)
+
+    def test_revalidation_skips_database(self):
+        address = reverse('api:index')
+        etag = self.client.get(address)['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        with self.assertNumQueries(0):
+            response = self.client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.author, text='Новый')
+        response = self.client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
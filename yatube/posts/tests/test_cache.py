@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from core.cache import TwoLevelCache
+
+
+class TwoLevelCacheTest(SimpleTestCase):
+    def setUp(self):
+        # Two workers sharing one file cache.
+        params = {'OPTIONS': {'MAX_ENTRIES': 2}}
+        self.first = TwoLevelCache('shared', params)
+        self.second = TwoLevelCache('shared', params)
+        self.first.clear()
+        self.addCleanup(self.first.clear)
+
+    def test_writes_are_seen_by_other_workers(self):
+        self.first.set('key', 'old')
+        self.assertEqual(self.second.get('key'), 'old')
+        self.first.set('key', 'new')
+        self.assertEqual(self.second.get('key'), 'new')
+        self.second.delete('key')
+        self.assertIsNone(self.first.get('key'))
+        self.first.set('counter', 1)
+        self.second.incr('counter')
+        self.assertEqual(self.first.get('counter'), 2)
+        self.assertFalse(self.second.add('counter', 5))
+
+    def test_shared_cache_gets_keys_once_prefixed(self):
+        self.first.set('key', 'value', version=2)
+        shared = caches['shared']
+        self.assertIsNotNone(shared.get('key', version=2))
+        self.assertIsNotNone(shared.get('stamp:key', version=2))
+        self.assertIsNone(shared.get('key'))
+        self.assertEqual(self.second.get('key', version=2), 'value')
+
+    def test_add_and_incr_are_atomic(self):
+        workers = 8
+        barrier = Barrier(workers)
+        params = {'OPTIONS': {'MAX_ENTRIES': 2}}
+
+        def work(number):
+            # Every thread gets its own cache objects, like a process would.
+            cache = TwoLevelCache('shared', params)
+            barrier.wait()
+            added = cache.add('owner', number)
+            for _ in range(10):
+                cache.incr('counter')
+            return added
+
+        self.first.set('counter', 0)
+        with ThreadPoolExecutor(workers) as executor:
+            added = list(executor.map(work, range(workers)))
+        self.assertEqual(added.count(True), 1)
+        self.assertEqual(self.second.get('owner'), added.index(True))
+        self.assertEqual(self.second.get('counter'), workers * 10)
+
+    def test_hits_read_only_the_stamp(self):
+        self.first.set('page', 'x' * 10000)
+        shared = caches['shared']
+        with mock.patch.object(
+            shared, 'get_many', wraps=shared.get_many
+        ) as get_many:
+            self.assertEqual(self.first.get('page'), 'x' * 10000)
+        get_many.assert_called_once()
+
+    def test_local_entries_are_evicted_least_recently_used(self):
+        for key in ('a', 'b', 'c'):
+            self.first.set(key, key)
+        self.assertEqual(list(self.first._local), [':1:b', ':1:c'])
+        self.assertEqual(self.first.get_many(['a', 'b']), {'a': 'a', 'b': 'b'})
+        self.assertEqual(list(self.first._local), [':1:b', ':1:a'])
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..cards import prefetch_cards, render_card
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PostCardTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Старый текст', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def card(self):
+        return render_card(
+            Post.objects.select_related('author', 'group').get(
+                id=self.post.id
+            )
+        )
+
+    def test_card_is_cached_until_post_changes(self):
+        self.assertIn('Старый текст', self.card())
+        Post.objects.filter(id=self.post.id).update(text='Новый текст')
+        self.assertIn('Старый текст', self.card())
+        post = Post.objects.get(id=self.post.id)
+        post.save()
+        self.assertIn('Новый текст', self.card())
+
+    def test_card_follows_author_comments_and_group(self):
+        self.card()
+        self.user.first_name = 'Лев'
+        self.user.save()
+        self.assertIn('Лев', self.card())
+        Comment.objects.create(post=self.post, author=self.user, text='Ок')
+        self.assertIn('Комментариев: 1', self.card())
+        self.group.slug = 'new_slug'
+        self.group.save()
+        self.assertIn('/group/new_slug/', self.card())
+
+    def test_warm_page_renders_without_queries(self):
+        posts = list(Post.objects.select_related('author', 'group'))
+        prefetch_cards(posts)
+        cards = [render_card(post) for post in posts]
+        posts = list(Post.objects.select_related('author', 'group'))
+        with self.assertNumQueries(0):
+            prefetch_cards(posts)
+            self.assertEqual([render_card(post) for post in posts], cards)
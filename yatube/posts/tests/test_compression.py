@@ -0,0 +1,183 @@
+import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .. import compression
+from ..models import Post
+
+User = get_user_model()
+
+
+class CompressedPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.user, text='Текст ' * 100)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.address = reverse('posts:index')
+
+    def test_variant_matches_accept_encoding(self):
+        plain = self.client.get(self.address)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        response = self.client.get(
+            self.address, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(
+            int(response['Content-Length']), len(response.content)
+        )
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+    def test_hits_do_not_compress(self):
+        self.client.get(self.address)
+        failing = {
+            coding: mock.Mock(side_effect=AssertionError)
+            for coding in compression.COMPRESSORS
+        }
+        with mock.patch.dict(compression.COMPRESSORS, failing):
+            response = self.client.get(
+                self.address, HTTP_ACCEPT_ENCODING='gzip'
+            )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_refused_encodings_are_not_served(self):
+        cases = {
+            'gzip;q=0, identity': None,
+            '*;q=0': None,
+            'gzip;q=0, *': 'br' if 'br' in compression.COMPRESSORS else None,
+            '*': next(iter(compression.COMPRESSORS)),
+        }
+        for header, coding in cases.items():
+            with self.subTest(header=header):
+                response = self.client.get(
+                    self.address, HTTP_ACCEPT_ENCODING=header
+                )
+                self.assertEqual(response.get('Content-Encoding'), coding)
+
+    def test_accepted_encodings(self):
+        cases = {
+            '': {},
+            'gzip': {'gzip': 1.0},
+            'br;q=1.0, GZIP;q=0.5': {'br': 1.0, 'gzip': 0.5},
+            'gzip;q=0, *': {'gzip': 0.0, '*': 1.0},
+            'gzip;q=x': {},
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(
+                    compression.accepted_encodings(header), expected
+                )
+
+
+class StampedeProtectionTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        compression.stats.clear()
+        self.renders = 0
+
+        def view(request):
+            self.renders += 1
+            return HttpResponse(f'Рендер {self.renders}')
+
+        self.view = compression.compressed_cache_page(20, 'test')(view)
+        self.request = RequestFactory().get('/')
+        self.request.user = AnonymousUser()
+        self.key = compression.page_key(self.request, 'test')
+
+    def expire(self):
+        entry = cache.get(self.key)
+        cache.set(self.key, entry._replace(expires=time.time() - 1))
+
+    def test_expired_page_is_rebuilt_once(self):
+        self.view(self.request)
+        self.expire()
+        cache.add(f'lock:{self.key}', 1)
+        response = self.view(self.request)
+        self.assertEqual(response.content.decode(), 'Рендер 1')
+        cache.delete(f'lock:{self.key}')
+        response = self.view(self.request)
+        self.assertEqual(response.content.decode(), 'Рендер 2')
+        self.assertEqual(self.view(self.request).content, response.content)
+        self.assertEqual(
+            compression.stats,
+            {'miss': 1, 'stale': 1, 'refresh': 1, 'hit': 1}
+        )
+
+    def test_pages_close_to_expiry_are_refreshed_early(self):
+        self.view(self.request)
+        entry = cache.get(self.key)
+        cache.set(
+            self.key, entry._replace(expires=time.time() + 1, delta=1)
+        )
+        with mock.patch.object(
+            compression.random, 'random', return_value=0.999
+        ):
+            self.view(self.request)
+        self.assertEqual(self.renders, 2)
+        with mock.patch.object(
+            compression.random, 'random', return_value=0
+        ):
+            self.view(self.request)
+        self.assertEqual(self.renders, 2)
+
+    def test_missing_page_is_waited_for(self):
+        cache.add(f'lock:{self.key}', 1)
+
+        def other_worker(seconds):
+            compression.render_page(
+                self.request, self.view.__wrapped__, (), {}, self.key, 20
+            )
+
+        with mock.patch.object(
+            compression.time, 'sleep', side_effect=other_worker
+        ):
+            response = self.view(self.request)
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(response.content.decode(), 'Рендер 1')
+        self.assertEqual(compression.stats, {'hit': 1})
+
+    def test_concurrent_misses_render_once(self):
+        workers = 8
+        barrier = Barrier(workers)
+
+        def view(request):
+            self.renders += 1
+            time.sleep(0.2)
+            return HttpResponse(f'Рендер {self.renders}')
+
+        cached_view = compression.compressed_cache_page(20, 'test')(view)
+
+        def request_page(_):
+            barrier.wait()
+            return cached_view(self.request).content.decode()
+
+        has_key = FileBasedCache.has_key
+
+        def slow_has_key(*args, **kwargs):
+            # Widens the gap between checking for the lock and taking it.
+            found = has_key(*args, **kwargs)
+            time.sleep(0.05)
+            return found
+
+        with mock.patch.object(FileBasedCache, 'has_key', slow_has_key):
+            with ThreadPoolExecutor(workers) as executor:
+                contents = set(executor.map(request_page, range(workers)))
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(contents, {'Рендер 1'})
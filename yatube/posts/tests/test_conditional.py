@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Текст', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.addresses = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[self.post.id]),
+        ]
+
+    def revalidate(self, address, response):
+        return self.client.get(
+            address,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+
+    def test_unchanged_pages_are_not_modified(self):
+        for address in self.addresses:
+            with self.subTest(address=address):
+                response = self.client.get(address)
+                self.assertEqual(response.status_code, 200)
+                with self.assertNumQueries(2):
+                    # Only the session and its user are loaded.
+                    revalidated = self.revalidate(address, response)
+                self.assertEqual(revalidated.status_code, 304)
+
+    def test_changes_invalidate_validators(self):
+        changes = {
+            'пост': (
+                lambda: Post.objects.create(
+                    author=self.author, text='Новый', group=self.group
+                ),
+                self.addresses,
+            ),
+            'комментарий': (
+                lambda: Comment.objects.create(
+                    post=self.post, author=self.user, text='Ок'
+                ),
+                self.addresses,
+            ),
+            'подписка': (
+                lambda: Follow.objects.create(
+                    user=self.user, author=self.author
+                ),
+                self.addresses,
+            ),
+        }
+        for name, (change, changed) in changes.items():
+            responses = {
+                address: self.client.get(address)
+                for address in self.addresses
+            }
+            change()
+            for address in changed:
+                with self.subTest(change=name, address=address):
+                    revalidated = self.revalidate(
+                        address, responses[address]
+                    )
+                    self.assertEqual(revalidated.status_code, 200)
+
+    def test_follow_changes_follower_profile(self):
+        address = reverse('posts:profile', args=[self.user.username])
+        guest = Client()
+        response = guest.get(address)
+        Follow.objects.create(user=self.user, author=self.author)
+        revalidated = guest.get(
+            address,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertEqual(revalidated.context['following_count'], 1)
+
+    def test_author_rename_changes_feeds(self):
+        responses = {
+            address: self.client.get(address) for address in self.addresses
+        }
+        self.author.first_name = 'Лев'
+        self.author.save()
+        for address in self.addresses:
+            with self.subTest(address=address):
+                revalidated = self.revalidate(address, responses[address])
+                self.assertEqual(revalidated.status_code, 200)
+
+    def test_validators_depend_on_viewer(self):
+        address = self.addresses[0]
+        response = self.client.get(address)
+        other = Client()
+        other.force_login(self.author)
+        revalidated = other.get(address, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 200)
@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..counters import post_count, user_counts
+from ..models import Comment, Counter, Group, Post
+
+User = get_user_model()
+
+
+class PostCounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test_slug_2',
+            description='Тестовое описание 2',
+        )
+        Post.objects.create(author=cls.user, text='Текст', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counters_follow_posts(self):
+        self.assertEqual(post_count(), 1)
+        self.assertEqual(post_count(group=self.group), 1)
+        self.assertEqual(post_count(author=self.user), 1)
+        post = Post.objects.create(
+            author=self.user,
+            text='Текст 2',
+            group=self.group
+        )
+        self.assertEqual(post_count(), 2)
+        self.assertEqual(post_count(group=self.group), 2)
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(post_count(group=self.group), 1)
+        self.assertEqual(post_count(group=self.other_group), 1)
+        post.delete()
+        self.assertEqual(post_count(), 1)
+        self.assertEqual(post_count(author=self.user), 1)
+        self.assertEqual(post_count(group=self.other_group), 0)
+
+    def test_paginator_reads_counter(self):
+        Counter.objects.create(name='posts', value=25)
+        response = Client().get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 25)
+
+    def test_follow_and_comment_counters(self):
+        reader = User.objects.create_user(username='reader')
+        self.assertEqual(user_counts(self.user)['followers_count'], 0)
+        client = Client()
+        client.force_login(reader)
+        client.get(
+            reverse('posts:profile_follow', kwargs={'username': self.user})
+        )
+        client.get(
+            reverse('posts:profile_follow', kwargs={'username': self.user})
+        )
+        self.assertEqual(user_counts(self.user)['followers_count'], 1)
+        self.assertEqual(user_counts(reader)['following_count'], 1)
+        post = Post.objects.get(author=self.user)
+        comment = Comment.objects.create(post=post, author=reader, text='!')
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        reader.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(user_counts(self.user)['followers_count'], 0)
+
+    def test_recount_repairs_drift(self):
+        post = Post.objects.get(author=self.user)
+        Comment.objects.create(post=post, author=self.user, text='!')
+        user_counts(self.user)
+        Counter.objects.filter(name=f'posts:author:{self.user.id}').update(
+            value=42
+        )
+        Post.objects.update(comments_count=7)
+        call_command('recount', stdout=StringIO())
+        self.assertEqual(user_counts(self.user)['posts_count'], 1)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..feed import popular_authors, user_feed
+from ..models import Follow, Post, Timeline
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.other = User.objects.create_user(username='other')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Старый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_follow_backfills_timeline(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertTrue(
+            Timeline.objects.filter(
+                user=self.reader,
+                post=self.old_post
+            ).exists()
+        )
+        self.assertIn(self.old_post, user_feed(self.reader))
+
+    def test_new_post_fans_out(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(list(user_feed(self.reader))[0], post)
+        self.assertFalse(Timeline.objects.filter(user=self.other).exists())
+
+    def test_unfollow_prunes_timeline(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.filter(user=self.reader, author=self.author).delete()
+        self.assertFalse(Timeline.objects.filter(user=self.reader).exists())
+        self.assertNotIn(self.old_post, user_feed(self.reader))
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_popular_author_is_pulled(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.other, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertFalse(Timeline.objects.filter(post=post).exists())
+        feed = list(user_feed(self.reader))
+        self.assertEqual(feed[0], post)
+        self.assertEqual(feed.count(self.old_post), 1)
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_popularity_is_read_from_counters(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.other, author=self.author)
+        self.assertEqual(popular_authors(self.reader), [self.author.id])
+        with self.assertNumQueries(1):
+            popular_authors(self.reader)
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_author_losing_followers_is_fanned_out(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.other, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        Follow.objects.filter(user=self.other).delete()
+        self.assertTrue(
+            Timeline.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(list(user_feed(self.reader)), [post, self.old_post])
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_follow_of_popular_author_backfills_timeline(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.other, author=self.author)
+        self.assertTrue(
+            Timeline.objects.filter(user=self.other, post=self.old_post)
+        )
+        Follow.objects.filter(user=self.reader).delete()
+        self.assertEqual(list(user_feed(self.other)), [self.old_post])
+
+    @override_settings(POSTS_NUM=1)
+    def test_follow_index_cursor(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        client = Client()
+        client.force_login(self.reader)
+        address = reverse('posts:follow_index')
+        page_obj = client.get(address).context['page_obj']
+        self.assertEqual(list(page_obj), [post])
+        response = client.get(address + '?after=' + page_obj.next_cursor)
+        self.assertEqual(list(response.context['page_obj']), [self.old_post])
@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import following
+from ..following import is_following
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowingCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(3)
+        ]
+        for author in cls.authors:
+            Post.objects.create(author=author, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def follow_links(self):
+        response = self.client.get(reverse('posts:index'))
+        return {
+            author.username: reverse(
+                'posts:profile_unfollow', args=[author.username]
+            ) in response.content.decode()
+            for author in self.authors
+        }
+
+    def test_follow_state_is_cached_per_user(self):
+        user = User.objects.get(id=self.user.id)
+        with self.assertNumQueries(1):
+            for author in self.authors:
+                self.assertFalse(is_following(user, author.id))
+        user = User.objects.get(id=self.user.id)
+        with self.assertNumQueries(0):
+            self.assertFalse(is_following(user, self.authors[0].id))
+
+    def test_follow_buttons_follow_subscriptions(self):
+        self.assertEqual(
+            self.follow_links(),
+            {'author0': False, 'author1': False, 'author2': False}
+        )
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.authors[1].username])
+        )
+        self.assertEqual(
+            self.follow_links(),
+            {'author0': False, 'author1': True, 'author2': False}
+        )
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[self.authors[1].username])
+        )
+        self.assertFalse(any(self.follow_links().values()))
+
+    def test_set_loaded_before_a_follow_is_not_kept(self):
+        author = self.authors[0]
+
+        def follow_while_loading(ids):
+            ids = sorted(ids)
+            Follow.objects.create(user=self.user, author=author)
+            return ids
+
+        user = User.objects.get(id=self.user.id)
+        with mock.patch.object(
+            following, 'sorted', follow_while_loading, create=True
+        ):
+            self.assertFalse(is_following(user, author.id))
+        user = User.objects.get(id=self.user.id)
+        self.assertTrue(is_following(user, author.id))
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class SharedPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Текст', group=cls.group
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.clients = {None: Client()}
+        for user in (self.author, self.reader):
+            self.clients[user.username] = Client()
+            self.clients[user.username].force_login(user)
+        self.addresses = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[self.post.id]),
+        ]
+
+    def test_page_is_rendered_once_for_everyone(self):
+        for address in self.addresses:
+            with self.subTest(address=address):
+                cache.clear()
+                self.clients['author'].get(address)
+                Post.objects.filter(pk=self.post.pk).update(text='Новый')
+                for username, client in self.clients.items():
+                    content = client.get(address).content.decode()
+                    self.assertIn('Текст', content)
+                    self.assertNotIn('<!--fragment:', content)
+                    if username:
+                        self.assertIn(f'Пользователь: {username}', content)
+                    else:
+                        self.assertIn(reverse('users:login'), content)
+                Post.objects.filter(pk=self.post.pk).update(text='Текст')
+
+    def test_fragments_follow_the_user(self):
+        unfollow = reverse('posts:profile_unfollow', args=['author'])
+        edit = reverse('posts:post_edit', args=[self.post.id])
+        for address in self.addresses:
+            contents = {
+                username: client.get(address).content.decode()
+                for username, client in self.clients.items()
+            }
+            if address == self.addresses[-1]:
+                break
+            with self.subTest(address=address):
+                self.assertIn(unfollow, contents['reader'])
+                self.assertNotIn(unfollow, contents['author'])
+                self.assertNotIn(unfollow, contents[None])
+        self.assertIn(edit, contents['author'])
+        self.assertNotIn(edit, contents['reader'])
+        self.assertIn('csrfmiddlewaretoken', contents['reader'])
+        self.assertNotIn('csrfmiddlewaretoken', contents[None])
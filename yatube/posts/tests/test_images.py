@@ -0,0 +1,102 @@
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..forms import PostForm
+from ..images import ingest_image
+from ..models import Post
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+User = get_user_model()
+
+
+def make_jpeg(size, orientation=None):
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    content = io.BytesIO()
+    Image.new('RGB', size, 'red').save(content, 'JPEG', exif=exif)
+    return SimpleUploadedFile(
+        name='photo.jpg',
+        content=content.getvalue(),
+        content_type='image/jpeg'
+    )
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_IMAGE_MAX_SIDE=100, THUMBNAIL_ASYNC=False
+)
+class ImageIngestTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    @override_settings(POST_IMAGE_MAX_SIZE=100)
+    def test_form_rejects_oversized_upload(self):
+        form = PostForm(
+            data={'text': 'Текст'}, files={'image': make_jpeg((300, 100))}
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    @override_settings(POST_IMAGE_MAX_SIZE=100)
+    def test_oversized_upload_is_not_read_to_the_end(self):
+        client = Client()
+        client.force_login(self.user)
+        image = SimpleUploadedFile(
+            name='photo.jpg', content=b'0' * 2 ** 20,
+            content_type='image/jpeg'
+        )
+        response = client.post(
+            reverse('posts:create'), {'text': 'Текст', 'image': image}
+        )
+        # Only the chunks before the limit came off the request stream.
+        self.assertGreater(response.wsgi_request._stream.remaining, 2 ** 19)
+        form = response.context['form']
+        self.assertNotIn('image', form.files)
+        self.assertIn('image', form.errors)
+        self.assertFalse(Post.objects.exists())
+        strict = Client(enforce_csrf_checks=True)
+        strict.force_login(self.user)
+        response = strict.post(
+            reverse('posts:create'), {'text': 'Текст'}
+        )
+        self.assertTemplateUsed(response, 'core/403csrf.html')
+        self.assertFalse(Post.objects.exists())
+
+    def test_ingest_rotates_downsizes_and_strips_metadata(self):
+        post = Post.objects.create(
+            author=self.user,
+            text='Текст',
+            image=make_jpeg((300, 100), orientation=6)
+        )
+        original = post.image.name
+        ingest_image(post.id)
+        post = Post.objects.get(id=post.id)
+        self.assertNotEqual(post.image.name, original)
+        self.assertFalse(default_storage.exists(original))
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (33, 100))
+            self.assertNotIn('exif', image.info)
+
+    def test_ingest_keeps_small_clean_original(self):
+        post = Post.objects.create(
+            author=self.user, text='Текст', image=make_jpeg((50, 20))
+        )
+        original = post.image.name
+        ingest_image(post.id)
+        self.assertEqual(Post.objects.get(id=post.id).image.name, original)
@@ -0,0 +1,112 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..feed import popular_authors
+from ..models import Comment, Follow, Group, Post
+from ..utils import encode_cursor
+
+User = get_user_model()
+# A full scan of a table, as opposed to a scan of one of its indexes.
+re_full_scan = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+
+
+class QueryPlanTest(TestCase):
+    """The feed views must not scan whole tables or sort in memory."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User.objects.bulk_create(
+            User(username=f'user{i}') for i in range(20)
+        )
+        cls.users = list(User.objects.order_by('id'))
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'group{i}', description='Описание'
+            )
+            for i in range(5)
+        ]
+        now = timezone.now()
+        Post.objects.bulk_create(
+            Post(
+                author=cls.users[i % 20],
+                group=cls.groups[i % 5] if i % 3 else None,
+                text=f'Текст поста {i}',
+                pub_date=now - timedelta(minutes=i),
+            )
+            for i in range(2000)
+        )
+        cls.post = Post.objects.order_by('pk').last()
+        Comment.objects.bulk_create(
+            Comment(post=post, author=cls.users[0], text='Комментарий')
+            for post in Post.objects.all()[:200]
+            for _ in range(5)
+        )
+        for user in cls.users[1:]:
+            Follow.objects.create(user=user, author=cls.users[0])
+        for author in cls.users[2:6]:
+            Follow.objects.create(user=cls.users[1], author=author)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.users[1])
+
+    def problems(self, address):
+        tables = connection.introspection.table_names()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(address)
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                for *_, detail in cursor.fetchall():
+                    scan = re_full_scan.match(detail)
+                    sort = detail.startswith('USE TEMP B-TREE')
+                    if sort or scan and scan.group(1) in tables:
+                        yield f'{detail}: {sql}'
+
+    def test_feed_views_use_indexes(self):
+        post = Post.objects.all()[30]
+        addresses = [
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=3',
+            reverse('posts:index') + '?after=' + encode_cursor(
+                post.pub_date, post.pk
+            ),
+            reverse('posts:group_list', args=[self.groups[0].slug]),
+            reverse('posts:profile', args=[self.users[0].username]),
+            reverse('posts:post_detail', args=[self.post.id]),
+            reverse('posts:follow_index'),
+        ]
+        for address in addresses:
+            with self.subTest(address=address):
+                self.assertEqual(list(self.problems(address)), [])
+
+    @override_settings(FEED_FANOUT_LIMIT=5)
+    def test_pulled_feed_uses_indexes(self):
+        # users[0] has 19 followers, so their posts are pulled on read.
+        self.assertEqual(popular_authors(self.users[1]), [self.users[0].id])
+        post = Post.objects.filter(author=self.users[2])[3]
+        addresses = [
+            reverse('posts:follow_index'),
+            reverse('posts:follow_index') + '?page=3',
+            reverse('posts:follow_index') + '?after=' + encode_cursor(
+                post.pub_date, post.pk
+            ),
+        ]
+        for address in addresses:
+            with self.subTest(address=address):
+                self.assertEqual(list(self.problems(address)), [])
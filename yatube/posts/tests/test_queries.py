@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.middleware import QueryBudgetExceeded
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.post = cls.create_posts(2)
+
+    @classmethod
+    def create_posts(cls, num):
+        for i in range(num):
+            post = Post.objects.create(
+                author=cls.author,
+                text=f'Текст {i}',
+                group=cls.group,
+            )
+            Comment.objects.create(post=post, author=cls.user, text='Текст')
+        return post
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def count_queries(self, address):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(address)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        addresses = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:follow_index'),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('posts:search') + '?q=Текст',
+        ]
+        for address in addresses:
+            self.count_queries(address)
+        counts = [self.count_queries(address) for address in addresses]
+        self.create_posts(settings.POSTS_NUM)
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.user, text='Текст')
+            for _ in range(settings.POSTS_NUM)
+        )
+        for address, count in zip(addresses, counts):
+            with self.subTest(address=address):
+                self.assertEqual(self.count_queries(address), count)
+
+    @override_settings(QUERY_BUDGETS={'posts:index': 1})
+    def test_budget_exceeded(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.authorized_client.get(reverse('posts:index'))
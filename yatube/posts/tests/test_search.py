@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post
+from ..search import search_posts
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.rare = Post.objects.create(
+            author=cls.user, text='Кот сидел на окне'
+        )
+        cls.frequent = Post.objects.create(
+            author=cls.user, text='Кот, кот и ещё раз кот'
+        )
+        Post.objects.create(author=cls.user, text='Собака во дворе')
+
+    def test_search_ranks_matches(self):
+        self.assertEqual(
+            list(search_posts('кот')), [self.frequent, self.rare]
+        )
+        self.assertEqual(list(search_posts('кот окне')), [self.rare])
+        self.assertFalse(search_posts('"OR ('))
+        self.assertEqual(
+            list(search_posts('кот\x00')), [self.frequent, self.rare]
+        )
+        self.assertFalse(search_posts('\x00'))
+
+    def test_index_follows_edits_and_deletes(self):
+        Post.objects.filter(id=self.rare.id).update(text='Пёс на окне')
+        self.assertEqual(list(search_posts('кот')), [self.frequent])
+        self.assertEqual(list(search_posts('пёс')), [self.rare])
+        Post.objects.filter(id=self.frequent.id).delete()
+        self.assertFalse(search_posts('кот'))
+
+    def test_search_page_keeps_query_in_pagination(self):
+        for i in range(12):
+            Post.objects.create(author=self.user, text=f'Кот номер {i}')
+        response = Client().get(reverse('posts:search'), {'q': 'кот'})
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertContains(response, '?q=%D0%BA%D0%BE%D1%82&amp;page=2')
+        self.assertNotContains(response, 'Собака')
+        response = Client().get(reverse('posts:search'), {'q': '\x00'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_search_uses_index(self):
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'кот'}
+        )
+        self.assertEqual(
+            set(response.context['cl'].result_list),
+            {self.rare, self.frequent}
+        )
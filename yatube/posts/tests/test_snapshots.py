@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from .. import snapshots
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+TEMP_SNAPSHOT_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    SNAPSHOT_DIR=TEMP_SNAPSHOT_DIR, SNAPSHOT_PROFILES=1, SNAPSHOT_PUBLISH=True
+)
+class SnapshotTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(author=cls.author, text='Первый', group=cls.group)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_SNAPSHOT_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def read(self, path):
+        filename = snapshots.page_file(snapshots.current_dir(), path)
+        if not os.path.exists(filename):
+            return None
+        with open(filename, encoding='utf-8') as file:
+            return file.read()
+
+    def run_callbacks(self, queued):
+        for _, callback in connection.run_on_commit[queued:]:
+            callback()
+
+    def test_command_publishes_a_new_generation(self):
+        out = StringIO()
+        call_command('publish_snapshots', stdout=out)
+        self.assertIn('Опубликовано страниц: 3', out.getvalue())
+        first = os.path.realpath(snapshots.current_dir())
+        self.assertIn('Первый', self.read('/'))
+        self.assertIn('Первый', self.read('/group/test_slug/'))
+        self.assertIn('Первый', self.read('/profile/author/'))
+        self.assertIsNone(self.read('/profile/reader/'))
+        self.assertTrue(os.path.exists(
+            snapshots.page_file(first, '/') + '.gz'
+        ))
+        snapshots.publish_all()
+        self.assertNotEqual(os.path.realpath(snapshots.current_dir()), first)
+        self.assertFalse(os.path.exists(first))
+
+    def test_changes_are_published_incrementally(self):
+        snapshots.publish_all()
+        queued = len(connection.run_on_commit)
+        Post.objects.create(
+            author=self.author, text='Второй', group=self.group
+        )
+        Post.objects.create(author=self.reader, text='Третий')
+        self.run_callbacks(queued)
+        for path in ('/', '/group/test_slug/', '/profile/author/'):
+            with self.subTest(path=path):
+                self.assertIn('Второй', self.read(path))
+        self.assertIn('Третий', self.read('/'))
+        self.assertIsNone(self.read('/profile/reader/'))
+
+    def test_deleted_group_is_pruned(self):
+        snapshots.publish_all()
+        queued = len(connection.run_on_commit)
+        group = Group.objects.create(title='Другая', slug='other')
+        self.run_callbacks(queued)
+        self.assertIn('Другая', self.read('/group/other/'))
+        queued = len(connection.run_on_commit)
+        group.delete()
+        self.run_callbacks(queued)
+        self.assertIsNone(self.read('/group/other/'))
+        self.assertFalse(os.path.exists(
+            os.path.join(snapshots.current_dir(), 'group', 'other')
+        ))
+
+    def test_renamed_group_moves_its_page(self):
+        snapshots.publish_all()
+        queued = len(connection.run_on_commit)
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'renamed'
+        group.save()
+        self.run_callbacks(queued)
+        self.assertIsNone(self.read('/group/test_slug/'))
+        self.assertIn('Первый', self.read('/group/renamed/'))
@@ -0,0 +1,178 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..management.commands import generate_thumbnails as command
+from ..models import PendingImage, Post
+from ..thumbnails import (cached_thumbnails, generate_thumbnails,
+                          prefetch_thumbnails)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+User = get_user_model()
+CARD = 'card_960_jpeg'
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Любой текст',
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_shows_placeholder_until_generated(self):
+        address = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.id}
+        )
+        response = self.client.get(address)
+        self.assertContains(response, 'Изображение обрабатывается')
+        self.assertIsNone(cached_thumbnails(self.post.image)[CARD])
+        generate_thumbnails(self.post.id)
+        thumbnail = cached_thumbnails(self.post.image)[CARD]
+        self.assertIsNotNone(thumbnail)
+        response = self.client.get(address)
+        self.assertContains(response, thumbnail.url)
+
+    def test_page_renders_responsive_image(self):
+        generate_thumbnails(self.post.id)
+        response = self.client.get(reverse('posts:index'))
+        thumbnails = cached_thumbnails(self.post.image)
+        for width in (480, 960, 1440):
+            thumbnail = thumbnails[f'card_{width}_jpeg']
+            self.assertContains(response, f'{thumbnail.url} {width}w')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, 'width="960" height="339"')
+
+    def test_page_render_does_not_generate(self):
+        self.client.get(reverse('posts:index'))
+        self.assertIsNone(cached_thumbnails(self.post.image)[CARD])
+
+    @override_settings(THUMBNAIL_ASYNC=False)
+    def test_form_enqueues_after_commit(self):
+        client = Client()
+        client.force_login(self.user)
+        queued = len(connection.run_on_commit)
+        client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={
+                'text': 'Новый текст',
+                'image': SimpleUploadedFile(
+                    name='new.gif',
+                    content=SMALL_GIF,
+                    content_type='image/gif'
+                )
+            }
+        )
+        callbacks = connection.run_on_commit[queued:]
+        self.assertEqual(len(callbacks), 1)
+        _, callback = callbacks[0]
+        callback()
+        post = Post.objects.get(id=self.post.id)
+        self.assertIsNotNone(cached_thumbnails(post.image)[CARD])
+
+    def test_prefetch_fetches_page_in_one_lookup(self):
+        posts = [self.post] + [
+            Post.objects.create(
+                author=self.user,
+                text=f'Пост {i}',
+                image=SimpleUploadedFile(
+                    name=f'small{i}.gif',
+                    content=SMALL_GIF,
+                    content_type='image/gif'
+                )
+            )
+            for i in range(3)
+        ]
+        for post in posts[1:]:
+            generate_thumbnails(post.id)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            prefetch_thumbnails(posts)
+        self.assertEqual(len(queries), 1)
+        self.assertIsNone(posts[0].thumbnails[CARD])
+        for post in posts[1:]:
+            self.assertIsNotNone(post.thumbnails[CARD])
+        with self.assertNumQueries(0):
+            prefetch_thumbnails(posts)
+
+    def test_new_image_is_pending_until_generated(self):
+        PendingImage.objects.all().delete()
+        post = Post.objects.get(id=self.post.id)
+        post.text = 'Другой текст'
+        post.save()
+        self.assertFalse(PendingImage.objects.exists())
+        post.image = SimpleUploadedFile(
+            name='new.gif', content=SMALL_GIF, content_type='image/gif'
+        )
+        post.save()
+        self.assertTrue(PendingImage.objects.filter(post=post).exists())
+        generate_thumbnails(post.id)
+        self.assertFalse(PendingImage.objects.exists())
+
+    def test_watch_picks_up_images_of_old_posts(self):
+        newer = Post.objects.create(author=self.user, text='Новый пост')
+        generate_thumbnails(self.post.id)
+
+        sleeps = []
+
+        def sleep(seconds):
+            # The first pause gives the old post a new image, the second
+            # one stops the worker.
+            if sleeps:
+                raise KeyboardInterrupt
+            sleeps.append(seconds)
+            post = Post.objects.get(id=self.post.id)
+            post.image = SimpleUploadedFile(
+                name='edited.gif', content=SMALL_GIF, content_type='image/gif'
+            )
+            post.save()
+            PendingImage.objects.update(
+                created=timezone.now() - timedelta(seconds=seconds)
+            )
+
+        with mock.patch.object(command, 'ingest_in_worker') as ingest, \
+                mock.patch.object(command, 'generate_in_worker'), \
+                mock.patch.object(command.time, 'sleep', sleep):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command(
+                    'generate_thumbnails', watch=5, stdout=StringIO()
+                )
+        self.assertLess(self.post.id, newer.id)
+        ingest.assert_called_once_with(self.post.id)
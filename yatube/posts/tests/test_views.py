@@ -1,13 +1,17 @@
+import base64
+from datetime import timedelta
+
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from ..models import Comment, Follow, Group, Post
-from ..utils import assertequal_test
+from ..utils import (EstimatedPaginator, FeedPaginator, assertequal_test,
+                     encode_cursor)
 
 User = get_user_model()
 
@@ -134,6 +138,15 @@ class PostViewsTest(TestCase):
         post_obj = response.context['post']
         assertequal_test(self, post_obj, PostViewsTest.post)
 
+    def test_post_detail_title_is_not_cut_by_str(self):
+        post = Post.objects.create(
+            author=self.user, text='Очень длинный текст поста для заголовка'
+        )
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.id})
+        )
+        self.assertContains(response, 'Очень длинный текст поста для…')
+
     def test_post_in_correct_pages(self):
         post_template = {
             reverse('posts:index'): 'page_obj',
@@ -261,6 +274,11 @@ class PostViewsTest(TestCase):
     def test_cache_index_page(self):
         first_response = self.client.get(reverse('posts:index'))
         first_content = first_response.content
+        Post.objects.filter(id=self.post.id).update(text='Без сигналов')
+        second_response = self.client.get(reverse('posts:index'))
+        second_content = second_response.content
+        self.assertEqual(first_content, second_content)
+        cache.set('unrelated', 'value')
         post_count = Post.objects.count()
         form_data = {
             'text': 'Тест кэш',
@@ -271,13 +289,23 @@ class PostViewsTest(TestCase):
             follow=True
         )
         self.assertEqual(Post.objects.count(), post_count + 1)
-        second_response = self.client.get(reverse('posts:index'))
-        second_content = second_response.content
-        self.assertEqual(first_content, second_content)
-        cache.clear()
         third_response = self.client.get(reverse('posts:index'))
         third_content = third_response.content
         self.assertNotEqual(second_content, third_content)
+        self.assertEqual(cache.get('unrelated'), 'value')
+
+    def test_cache_post_detail_invalidated_by_comment(self):
+        address = reverse(
+            'posts:post_detail', kwargs={'post_id': PostViewsTest.post.id}
+        )
+        self.client.get(address)
+        Comment.objects.create(
+            post=PostViewsTest.post,
+            author=self.user,
+            text='Свежий комментарий',
+        )
+        response = self.client.get(address)
+        self.assertContains(response, 'Свежий комментарий')
 
 
 class PaginatorViewsTest(TestCase):
@@ -333,3 +361,101 @@ class PaginatorViewsTest(TestCase):
                     self.assertEqual(len(
                         response_second.context[value]), diff_count
                     )
+
+    def test_cursor_pagination(self):
+        address = reverse('posts:index')
+        first_page = self.client.get(address).context['page_obj']
+        second_page = self.client.get(address + '?page=2').context['page_obj']
+        response = self.client.get(
+            address + '?after=' + first_page.next_cursor
+        )
+        after_page = response.context['page_obj']
+        self.assertEqual(list(after_page), list(second_page))
+        self.assertFalse(after_page.has_next())
+        response = self.client.get(
+            address + '?before=' + after_page.previous_cursor
+        )
+        self.assertEqual(
+            list(response.context['page_obj']), list(first_page)
+        )
+
+    def test_broken_cursor_opens_first_page(self):
+        address = reverse('posts:index')
+        post = Post.objects.first()
+        tokens = [
+            'broken',
+            base64.urlsafe_b64encode(b'garbage|5').decode(),
+            encode_cursor(post.pub_date, 10 ** 30),
+            encode_cursor(post.pub_date, -1),
+            base64.urlsafe_b64encode(
+                b'9999-12-31T23:59:59-05:00|5'
+            ).decode(),
+        ]
+        for token in tokens:
+            with self.subTest(token=token):
+                response = self.client.get(address, {'after': token})
+                self.assertEqual(response.context['page_obj'].number, 1)
+
+    def test_exhausted_cursor_opens_first_page(self):
+        address = reverse('posts:index')
+        first_page = self.client.get(address).context['page_obj']
+        oldest = Post.objects.order_by('pub_date', 'pk').first()
+        newest = Post.objects.order_by('pub_date', 'pk').last()
+        cursors = {
+            'after': encode_cursor(
+                oldest.pub_date - timedelta(days=1), oldest.pk
+            ),
+            'before': encode_cursor(
+                newest.pub_date + timedelta(days=1), newest.pk
+            ),
+        }
+        for direction, token in cursors.items():
+            with self.subTest(direction=direction):
+                response = self.client.get(address, {direction: token})
+                self.assertEqual(response.status_code, 200)
+                page_obj = response.context['page_obj']
+                self.assertEqual(list(page_obj), list(first_page))
+                self.assertIsNone(page_obj.previous_cursor)
+
+    def test_elided_page_range(self):
+        paginator = FeedPaginator(Post.objects.all(), 1)
+        self.assertEqual(
+            list(paginator.get_elided_page_range(7, on_each_side=2)),
+            [1, '…', 5, 6, 7, 8, 9, '…', 13]
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(2, on_each_side=2)),
+            [1, 2, 3, 4, '…', 13]
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'].page_window, [1, 2])
+
+    @override_settings(POSTS_COUNT_LIMIT=4, PAGE_RANGE_ON_EACH_SIDE=1)
+    def test_estimated_page_range(self):
+        paginator = EstimatedPaginator(Post.objects.all(), 1, number=6)
+        self.assertTrue(paginator.is_estimate)
+        self.assertEqual(
+            list(paginator.get_elided_page_range(6, on_each_side=1)),
+            [1, '…', 5, 6, 7, '…']
+        )
+        paginator = EstimatedPaginator(Post.objects.all(), 1, number=20)
+        self.assertFalse(paginator.is_estimate)
+        self.assertEqual(paginator.num_pages, len(self.post))
+
+    @override_settings(
+        POSTS_NUM=1, POSTS_COUNT_LIMIT=3, PAGE_RANGE_ON_EACH_SIDE=1
+    )
+    def test_follow_pages_past_estimate(self):
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        client = Client()
+        client.force_login(reader)
+        response = client.get(reverse('posts:follow_index'), {'page': 5})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.number, 5)
+        self.assertTrue(page_obj.has_next())
+        self.assertNotContains(response, 'Последняя')
+        response = client.get(reverse('posts:follow_index'), {'page': 50})
+        self.assertEqual(
+            response.context['page_obj'].number, len(self.post)
+        )
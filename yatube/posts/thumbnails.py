@@ -0,0 +1,141 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from PIL import Image
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend as BaseThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+from . import caching
+from .models import PendingImage, Post
+
+logger = logging.getLogger(__name__)
+_executor = None
+
+
+class ThumbnailBackend(BaseThumbnailBackend):
+    def get_thumbnail_file(self, file_, geometry_string, **options):
+        source = ImageFile(file_)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+
+class KVStore(cached_db_kvstore.KVStore):
+    def get_many(self, image_files):
+        """Look up several image files with one cache and one DB round trip."""
+        keys = [add_prefix(image_file.key) for image_file in image_files]
+        values = self.cache.get_many(keys)
+        missing = [key for key in keys if key not in values]
+        if missing:
+            found = dict(
+                KVStoreModel.objects.filter(key__in=missing).values_list(
+                    'key', 'value'
+                )
+            )
+            fetched = {
+                key: found.get(key, cached_db_kvstore.EMPTY_VALUE)
+                for key in missing
+            }
+            self.cache.set_many(fetched, sorl_settings.THUMBNAIL_CACHE_TIMEOUT)
+            values.update(fetched)
+        return [
+            None if values[key] == cached_db_kvstore.EMPTY_VALUE
+            else deserialize_image_file(values[key])
+            for key in keys
+        ]
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails'
+        )
+    return _executor
+
+
+@lru_cache(maxsize=None)
+def can_encode(image_format):
+    Image.init()
+    return image_format in Image.SAVE
+
+
+def thumbnail_specs():
+    """Map thumbnail names to (variant, format, geometry, options)."""
+    specs = {}
+    for variant, config in settings.POST_IMAGE_VARIANTS.items():
+        for image_format in filter(can_encode, config['formats']):
+            for width in config['widths']:
+                name = f'{variant}_{width}_{image_format.lower()}'
+                specs[name] = (
+                    variant,
+                    image_format,
+                    f'{width}x{round(width * config["ratio"])}',
+                    {**config['options'], 'format': image_format}
+                )
+    return specs
+
+
+def thumbnail_files(image):
+    return {
+        name: default.backend.get_thumbnail_file(image, geometry, **options)
+        for name, (_, _, geometry, options) in thumbnail_specs().items()
+    }
+
+
+def cached_thumbnails(image):
+    files = thumbnail_files(image)
+    return dict(zip(files, default.kvstore.get_many(files.values())))
+
+
+def prefetch_thumbnails(posts):
+    posts = [post for post in posts if post.image]
+    files = [thumbnail_files(post.image) for post in posts]
+    found = iter(default.kvstore.get_many([
+        image_file for variants in files for image_file in variants.values()
+    ]))
+    for post, variants in zip(posts, files):
+        post.thumbnails = {name: next(found) for name in variants}
+
+
+def generate_thumbnails(post_id):
+    try:
+        post = Post.objects.select_related('author').get(pk=post_id)
+        if post.image:
+            for _, _, geometry, options in thumbnail_specs().values():
+                get_thumbnail(post.image, geometry, **options)
+            caching.bump_post(post)
+        PendingImage.objects.filter(post_id=post_id).delete()
+    except Exception:
+        logger.exception('Не удалось создать миниатюры поста %s', post_id)
+
+
+def generate_in_worker(post_id):
+    try:
+        generate_thumbnails(post_id)
+    finally:
+        connection.close()
+
+
+def enqueue_thumbnails(post_id):
+    if settings.THUMBNAIL_ASYNC:
+        get_executor().submit(generate_in_worker, post_id)
+    else:
+        generate_thumbnails(post_id)
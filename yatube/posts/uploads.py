@@ -0,0 +1,40 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+
+class ImageSizeLimitHandler(FileUploadHandler):
+    """Stops reading the request once a file outgrows POST_IMAGE_MAX_SIZE.
+
+    The names of the cut off fields are collected in
+    request.stopped_uploads for the form to report.
+    """
+
+    def __init__(self, request):
+        super().__init__(request)
+        request.stopped_uploads = set()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.POST_IMAGE_MAX_SIZE:
+            self.request.stopped_uploads.add(self.field_name)
+            # The rest of the body is left unread, the server drops it
+            # with the connection.
+            raise StopUpload(connection_reset=True)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def limit_upload_size(view):
+    # The handler must be in place before the CSRF check reads the body.
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers.insert(0, ImageSizeLimitHandler(request))
+        return protected(request, *args, **kwargs)
+    return wrapper
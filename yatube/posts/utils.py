@@ -1,13 +1,211 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
 
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
 
-def pages(request, posts, POSTS_NUM):
-    paginator = Paginator(posts, POSTS_NUM)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+from .counters import estimated_count
+
+MAX_PK = 2 ** 63 - 1
+
+
+class FeedPaginator(Paginator):
+    ELLIPSIS = '…'
+    is_estimate = False
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_provider = count
+
+    @cached_property
+    def count(self):
+        if self.count_provider is None:
+            return super().count
+        if callable(self.count_provider):
+            return self.count_provider()
+        return self.count_provider
+
+    def get_elided_page_range(self, number=1, on_each_side=3, on_ends=1):
+        number = self.validate_number(number)
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            yield from self.open_end()
+            return
+        if number > on_each_side + on_ends + 2:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < self.num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            if not self.is_estimate:
+                yield from range(
+                    self.num_pages - on_ends + 1, self.num_pages + 1
+                )
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+            yield from self.open_end()
+
+    def open_end(self):
+        # The last page of an estimated count is not known.
+        if self.is_estimate:
+            yield self.ELLIPSIS
+
+
+class EstimatedPaginator(FeedPaginator):
+    """Counts rows only up to a few pages past the requested one.
+
+    A count that reaches the limit is a lower bound: every page it allows
+    exists, but which one is the last is unknown.
+    """
+
+    def __init__(self, object_list, per_page, number=1, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        try:
+            number = min(max(int(number), 1), MAX_PK // per_page)
+        except (TypeError, ValueError):
+            number = 1
+        self.limit = min(MAX_PK, max(
+            settings.POSTS_COUNT_LIMIT,
+            (number + settings.PAGE_RANGE_ON_EACH_SIDE) * per_page
+        ))
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list, self.limit)
+
+    @cached_property
+    def is_estimate(self):
+        return self.count >= self.limit
+
+
+class CursorPage(Page):
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+
+def encode_cursor(value, pk):
+    raw = f'{value.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        value, pk = raw.decode().split('|')
+        value, pk = parse_datetime(value), int(pk)
+        if value is None or not 0 < pk <= MAX_PK:
+            return None
+        # The database gets the value in UTC, which may not fit a datetime.
+        if timezone.is_aware(value):
+            value.astimezone(timezone.utc)
+        return value, pk
+    except (
+        binascii.Error, UnicodeDecodeError, ValueError, TypeError,
+        OverflowError
+    ):
+        return None
+
+
+def order_fields(posts):
+    """The field a feed is ordered by and the field breaking its ties."""
+    ordering = posts.query.order_by or posts.model._meta.ordering
+    fields = [field.lstrip('-') for field in ordering]
+    return fields[0], fields[1] if len(fields) > 1 else 'pk'
+
+
+def cursor_page(paginator, fields, cursor=None, backwards=False):
+    per_page = paginator.per_page
+    op = 'gt' if backwards else 'lt'
+    field, tie = fields
+    posts = paginator.object_list
+    if cursor is not None:
+        value, pk = cursor
+        posts = posts.filter(
+            Q(**{f'{field}__{op}': value})
+            | Q(**{field: value, f'{tie}__{op}': pk})
+        )
+    if backwards:
+        posts = posts.reverse()
+    posts = list(posts[:per_page + 1])
+    if not posts and cursor is not None:
+        # Nothing is left behind the cursor: the rows were deleted.
+        return cursor_page(paginator, fields)
+    has_more = len(posts) > per_page
+    posts = posts[:per_page]
+    if backwards:
+        return CursorPage(posts[::-1], paginator, True, has_more)
+    return CursorPage(posts, paginator, has_more, cursor is not None)
+
+
+def add_cursors(page_obj, fields):
+    page_obj.next_cursor = page_obj.previous_cursor = None
+    if page_obj.has_next():
+        last = page_obj[len(page_obj) - 1]
+        page_obj.next_cursor = encode_cursor(
+            *(getattr(last, field) for field in fields)
+        )
+    if page_obj.has_previous():
+        first = page_obj[0]
+        page_obj.previous_cursor = encode_cursor(
+            *(getattr(first, field) for field in fields)
+        )
     return page_obj
 
 
+def pages(request, posts, POSTS_NUM, count=None, cursor=True,
+          estimate=False):
+    """Paginate a feed, by keyset cursors when the request carries one.
+
+    Pass cursor=False for querysets that are not ordered by a date, such
+    as ranked search results: their ordering is kept as is. With
+    estimate=True the posts are counted only around the requested page.
+    """
+    if cursor:
+        fields = order_fields(posts)
+        posts = posts.order_by(*(f'-{field}' for field in fields))
+    if estimate:
+        paginator = EstimatedPaginator(
+            posts, POSTS_NUM, number=request.GET.get('page')
+        )
+    else:
+        paginator = FeedPaginator(posts, POSTS_NUM, count=count)
+    after = cursor and decode_cursor(request.GET.get('after'))
+    before = cursor and decode_cursor(request.GET.get('before'))
+    if after or before:
+        page_obj = cursor_page(paginator, fields, after or before, not after)
+    else:
+        page_obj = paginator.get_page(request.GET.get('page'))
+        page_obj.page_window = list(paginator.get_elided_page_range(
+            page_obj.number,
+            on_each_side=settings.PAGE_RANGE_ON_EACH_SIDE,
+            on_ends=settings.PAGE_RANGE_ON_ENDS
+        ))
+    if not cursor:
+        page_obj.next_cursor = page_obj.previous_cursor = None
+        return page_obj
+    return add_cursors(page_obj, fields)
+
+
 def assertequal_test(self, value, expected_value):
     self.assertEqual(value.text, expected_value.text)
     self.assertEqual(value.id, expected_value.id)
@@ -0,0 +1,51 @@
+"""Version and last-modified stamps of cached scopes.
+
+A scope is bumped whenever something shown under it changes, and keys
+built from its version are never read again after that.
+"""
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+
+def version_key(scope):
+    return f'version:{scope}'
+
+
+def get_versions(scopes):
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A lost version must never repeat an old one, so start from
+            # the clock instead of 1.
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def modified_key(scope):
+    return f'modified:{scope}'
+
+
+def get_modified(scopes):
+    """When any of the scopes was last bumped, as an aware datetime."""
+    keys = [modified_key(scope) for scope in scopes]
+    stamps = cache.get_many(keys)
+    for key in keys:
+        if key not in stamps:
+            cache.add(key, time.time(), None)
+            stamps[key] = cache.get(key)
+    return datetime.fromtimestamp(max(stamps.values()), timezone.utc)
+
+
+def bump(*scopes):
+    now = time.time()
+    cache.set_many({modified_key(scope): now for scope in scopes}, None)
+    for scope in scopes:
+        key = version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
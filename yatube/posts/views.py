@@ -1,31 +1,44 @@
+from functools import partial
+
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
 
+from .caching import cache_versioned, post_scopes
+from .cards import prefetch_cards
+from .counters import post_count, user_counts
+from .feed import user_feed
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .search import search_posts
+from .thumbnails import prefetch_thumbnails
+from .uploads import limit_upload_size
 from .utils import pages
 
 
-@cache_page(20, key_prefix='index_page')
+@cache_versioned(settings.PAGE_CACHE_TIMEOUT, lambda: ['feed'])
 def index(request):
-    posts = Post.objects.select_related('group').all()
-    page_obj = pages(request, posts, settings.POSTS_NUM)
+    posts = Post.objects.select_related('author', 'group')
+    page_obj = pages(request, posts, settings.POSTS_NUM, count=post_count)
+    prefetch_cards(page_obj)
     template = 'posts/index.html'
     context = {
         'title': 'Последние обновления на сайте',
         'page_obj': page_obj
     }
-    cache.clear()
     return render(request, template, context)
 
 
+@cache_versioned(
+    settings.PAGE_CACHE_TIMEOUT, lambda slug: [f'group:{slug}']
+)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = pages(request, posts, settings.POSTS_NUM)
+    posts = group.posts.select_related('author', 'group')
+    page_obj = pages(
+        request, posts, settings.POSTS_NUM, count=partial(post_count, group)
+    )
+    prefetch_cards(page_obj)
     template = 'posts/group_list.html'
     context = {
         'group': group,
@@ -34,35 +47,40 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@cache_versioned(
+    settings.PAGE_CACHE_TIMEOUT, lambda username: [f'author:{username}']
+)
 def profile(request, username):
     user = get_object_or_404(User, username=username)
-    posts = user.posts.all()
-    posts_count = posts.count()
-    page_obj = pages(request, posts, settings.POSTS_NUM)
+    posts = user.posts.select_related('author', 'group')
+    counts = user_counts(user)
+    page_obj = pages(
+        request, posts, settings.POSTS_NUM, count=counts['posts_count']
+    )
+    prefetch_cards(page_obj)
     template_name = 'posts/profile.html'
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user,
-            author=user
-        ).exists()
-    else:
-        following = False
     context = {
-        'posts_count': posts_count,
+        **counts,
         'page_obj': page_obj,
         'username': user,
-        'following': following
     }
     return render(request, template_name, context)
 
 
+@cache_versioned(
+    settings.PAGE_CACHE_TIMEOUT, post_scopes
+)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), id=post_id
+    )
+    prefetch_thumbnails([post])
     template_name = 'posts/post_detail.html'
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    comments = post.comments.select_related('author').order_by('created')
     context = {
         'post': post,
+        'posts_count': post_count(author=post.author),
         'comments': comments,
         'form': form
     }
@@ -70,28 +88,31 @@ def post_detail(request, post_id):
 
 
 @login_required
+@limit_upload_size
 def post_create(request):
     template_name = 'posts/create_post.html'
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
+        stopped_uploads=request.stopped_uploads,
     )
     if form.is_valid():
-        post = form.save(commit=False)
-        post.author = request.user
-        post.save()
+        form.instance.author = request.user
+        post = form.save()
         return redirect('posts:profile', username=post.author)
     return render(request, template_name, {'form': form})
 
 
 @login_required
+@limit_upload_size
 def post_edit(request, post_id):
     template_name = 'posts/create_post.html'
     post = get_object_or_404(Post, id=post_id)
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
-        instance=post
+        instance=post,
+        stopped_uploads=request.stopped_uploads,
     )
     context = {
         'form': form,
@@ -117,14 +138,27 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    if query:
+        posts = search_posts(query).select_related('author', 'group')
+    else:
+        posts = Post.objects.none()
+    page_obj = pages(request, posts, settings.POSTS_NUM, cursor=False)
+    prefetch_cards(page_obj)
+    context = {
+        'title': 'Поиск',
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(
-        author__in=request.user.follower.all().values_list(
-            'author', flat=True
-        )
-    )
-    page_obj = pages(request, posts, settings.POSTS_NUM)
+    posts = user_feed(request.user).select_related('author', 'group')
+    page_obj = pages(request, posts, settings.POSTS_NUM, estimate=True)
+    prefetch_cards(page_obj)
     context = {
         'page_obj': page_obj,
     }
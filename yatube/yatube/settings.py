@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -52,18 +53,106 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'yatube.urls'
+TEST_RUNNER = 'core.runner.TestRunner'
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 POSTS_NUM = 10
+# Posts of authors with more followers are pulled into feeds on read
+# instead of being fanned out to every follower's timeline.
+FEED_FANOUT_LIMIT = 1000
+FEED_BATCH_SIZE = 500
+# Seconds of posts that every pull copies again.
+FEED_PULL_OVERLAP = 60
+# Rows per statement for the set-based admin actions.
+BULK_BATCH_SIZE = 1000
+# Feeds without a maintained counter stop counting after this many posts.
+POSTS_COUNT_LIMIT = 1000
+PAGE_RANGE_ON_EACH_SIDE = 3
+PAGE_RANGE_ON_ENDS = 1
+
+PAGE_CACHE_TIMEOUT = 20
+# Cached pages are stored gzipped too (and brotli-compressed when the
+# brotli package is installed) once they are at least this long.
+PAGE_COMPRESS_MIN_LENGTH = 200
+# Expired pages are served for PAGE_CACHE_STALE_TIMEOUT more seconds while
+# one worker, holding a lock for at most PAGE_CACHE_LOCK_TIMEOUT, rebuilds
+# them. Workers with no copy at all wait up to PAGE_CACHE_LOCK_WAIT for it.
+PAGE_CACHE_STALE_TIMEOUT = 60
+PAGE_CACHE_LOCK_TIMEOUT = 10
+PAGE_CACHE_LOCK_WAIT = 2
+# How eagerly pages are rebuilt before they expire, 0 turns it off.
+PAGE_CACHE_EARLY_REFRESH = 1
+# Rendered feed cards are keyed by versions, so they can live long.
+POST_CARD_TIMEOUT = 60 * 60 * 24
+
+# Maximum number of SQL queries per request, by URL name. Requests over
+# budget are logged, or raise QueryBudgetExceeded if QUERY_BUDGET_RAISE.
+QUERY_BUDGETS = {
+    'posts:index': 10,
+    'posts:group_list': 10,
+    'posts:profile': 10,
+    'posts:post_detail': 10,
+    'posts:follow_index': 10,
+    'posts:search': 10,
+}
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGET_RAISE = False
 
+# Every worker keeps its hottest entries in memory and shares the rest
+# (and every invalidation) through the file cache.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache.TwoLevelCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {'MAX_ENTRIES': 500},
+    },
+    'shared': {
+        'BACKEND': 'core.cache.LockedFileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+THUMBNAIL_BACKEND = 'posts.thumbnails.ThumbnailBackend'
+THUMBNAIL_KVSTORE = 'posts.thumbnails.KVStore'
+# Responsive images rendered by the post templates, pre-generated on
+# upload in every width and format. Formats go from the most efficient
+# to the fallback; ones Pillow cannot encode here are skipped.
+POST_IMAGE_VARIANTS = {
+    'card': {
+        'widths': (480, 960, 1440),
+        'ratio': 339 / 960,
+        'formats': ('WEBP', 'JPEG'),
+        'sizes': '(min-width: 1200px) 825px, (min-width: 768px) 75vw, 100vw',
+        'options': {'crop': 'center', 'upscale': True},
+    },
 }
+# Process uploads in background workers; inline under DEBUG so the dev
+# server and the test runs never race a worker writing media files.
+THUMBNAIL_ASYNC = not DEBUG
+THUMBNAIL_WORKERS = 2
+
+# Static copies of the first pages of the index, the groups and the
+# SNAPSHOT_PROFILES most followed profiles, see posts.snapshots. The front
+# server answers anonymous reads from SNAPSHOT_DIR/current; turn on
+# SNAPSHOT_PUBLISH there to refresh them on every post and group change.
+SNAPSHOT_DIR = os.path.join(BASE_DIR, 'snapshots')
+SNAPSHOT_PUBLISH = False
+SNAPSHOT_PROFILES = 100
+SNAPSHOT_HOST = 'localhost'
+# Publish from a background worker; inline under DEBUG, as with uploads.
+SNAPSHOT_ASYNC = not DEBUG
+
+# Uploads above this size are streamed to a temporary file on disk.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+POST_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+# Stored originals are downsized to this side and re-encoded.
+POST_IMAGE_MAX_SIDE = 2560
+POST_IMAGE_QUALITY = 85
+IMAGE_WORKERS = 2
 
 TEMPLATES = [
     {
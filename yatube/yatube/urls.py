@@ -10,6 +10,7 @@ handler403 = 'core.views.permission_denied'
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
+    path('api/v1/', include('posts.api_urls', namespace='api')),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),